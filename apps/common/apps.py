@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class CommonApp(AppConfig):
+    name = "apps.common"
+
+    def ready(self):
+        # Connect the signal handlers in web and worker processes.
+        from apps.common import db  # noqa: F401
+        from apps.common.celery import metrics  # noqa: F401
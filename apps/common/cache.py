@@ -0,0 +1,233 @@
+"""
+Two-tier cache: a per-process LRU (L1) in front of a shared Django cache (L2).
+
+    from apps.common.cache import tiered_cache
+
+    count = tiered_cache().get_or_set(
+        f"active:{filters}", lambda: queryset.count(), timeout=60, namespace="users"
+    )
+    tiered_cache().invalidate_namespace("users")  # after users change
+
+get_or_set() protects expensive values against stampedes in two ways:
+
+- Single flight: on a miss, one caller (across all processes) takes a lock in
+  L2 and computes the value; the others wait up to TIERED_CACHE_LOCK_TIMEOUT
+  seconds for it before computing it themselves.
+- Early refresh: entries remember how long they took to compute, and each
+  read recomputes with a probability that grows as expiry nears and with the
+  compute time ("XFetch"). Hot keys are refreshed by one caller shortly before
+  they expire, while everyone else keeps getting the current value.
+
+Namespaces are versioned. invalidate_namespace() bumps the version in L2, so
+every key in the namespace is orphaned at once and ages out. Other processes
+see the new version when their local copy of it expires, after at most
+TIERED_CACHE_LOCAL_TIMEOUT seconds, which also bounds how stale L1 can be.
+"""
+
+import functools
+import logging
+import math
+import random
+import time
+from collections.abc import Callable
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import caches
+
+from apps.common.lru import MISSING, LRUCache
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "tiered"
+LOCK_POLL_INTERVAL = 0.05
+
+
+class TieredCache:
+    """
+    Cache values in this process and in the Django cache ``alias``.
+
+    Values are stored in both tiers as ``(value, expires_at, compute_time)``,
+    so ``None`` is a cacheable value and L1 copies never outlive the shared
+    entry.
+    """
+
+    def __init__(
+        self,
+        alias: str | None = None,
+        timeout: float | None = None,
+        local_maxsize: int | None = None,
+        local_timeout: float | None = None,
+        lock_timeout: float | None = None,
+        beta: float = 1.0,
+    ):
+        self.alias = alias or settings.TIERED_CACHE_ALIAS
+        self.timeout = timeout or settings.TIERED_CACHE_TIMEOUT
+        self.local_timeout = local_timeout or settings.TIERED_CACHE_LOCAL_TIMEOUT
+        self.lock_timeout = lock_timeout or settings.TIERED_CACHE_LOCK_TIMEOUT
+        self.beta = beta
+        self.local = LRUCache(
+            maxsize=local_maxsize or settings.TIERED_CACHE_LOCAL_MAXSIZE,
+            timeout=self.local_timeout,
+        )
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    def make_key(self, key: str, namespace: str | None = None) -> str:
+        if namespace is None:
+            return f"{KEY_PREFIX}:{key}"
+        return f"{KEY_PREFIX}:{namespace}:{self._version(namespace)}:{key}"
+
+    def get(self, key: str, default: Any = None, namespace: str | None = None) -> Any:
+        entry = self._get_entry(self.make_key(key, namespace))
+        return default if entry is None else entry[0]
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        timeout: float | None = None,
+        namespace: str | None = None,
+    ) -> None:
+        self._set_entry(self.make_key(key, namespace), value, timeout, 0.0)
+
+    def delete(self, key: str, namespace: str | None = None) -> None:
+        """Delete ``key`` here and in L2; other processes keep their L1 copy."""
+        full_key = self.make_key(key, namespace)
+        self.local.delete(full_key)
+        try:
+            self.shared.delete(full_key)
+        except Exception:
+            logger.warning("Could not delete from shared cache", exc_info=True)
+
+    def get_or_set(
+        self,
+        key: str,
+        producer: Callable[[], Any],
+        timeout: float | None = None,
+        namespace: str | None = None,
+    ) -> Any:
+        """Return the cached value of ``key``, computing it with ``producer()``."""
+        full_key = self.make_key(key, namespace)
+        entry = self._get_entry(full_key)
+        if entry is not None and not self._should_refresh(entry):
+            return entry[0]
+
+        lock_key = f"{full_key}:lock"
+        if self._acquire(lock_key):
+            try:
+                return self._compute(full_key, producer, timeout)
+            finally:
+                self._release(lock_key)
+        if entry is not None:
+            # Someone else is refreshing it; the current value is still valid.
+            return entry[0]
+        entry = self._wait_for(full_key)
+        if entry is not None:
+            return entry[0]
+        return self._compute(full_key, producer, timeout)
+
+    def invalidate_namespace(self, namespace: str) -> None:
+        """Orphan every key in ``namespace``."""
+        version_key = self._version_key(namespace)
+        self.local.delete(version_key)
+        try:
+            self.shared.incr(version_key)
+        except ValueError:
+            self.shared.set(version_key, time.time_ns(), None)
+
+    def clear_local(self) -> None:
+        self.local.clear()
+
+    def _version_key(self, namespace: str) -> str:
+        return f"{KEY_PREFIX}:ns:{namespace}"
+
+    def _version(self, namespace: str) -> int:
+        version_key = self._version_key(namespace)
+        version = self.local.get(version_key)
+        if version is not MISSING:
+            return version
+        try:
+            version = self.shared.get(version_key)
+            if version is None:
+                # Time-based, so a version evicted from L2 is never reused.
+                self.shared.add(version_key, time.time_ns(), None)
+                version = self.shared.get(version_key)
+        except Exception:
+            logger.warning("Shared cache unavailable", exc_info=True)
+            return 0
+        self.local.set(version_key, version)
+        return version
+
+    def _get_entry(self, full_key: str) -> tuple | None:
+        entry = self.local.get(full_key)
+        if entry is not MISSING:
+            return entry
+        try:
+            entry = self.shared.get(full_key)
+        except Exception:
+            logger.warning("Shared cache unavailable", exc_info=True)
+            return None
+        if entry is not None:
+            self._set_local(full_key, entry)
+        return entry
+
+    def _set_entry(self, full_key, value, timeout, compute_time) -> None:
+        timeout = timeout or self.timeout
+        entry = (value, time.time() + timeout, compute_time)
+        self._set_local(full_key, entry)
+        try:
+            self.shared.set(full_key, entry, math.ceil(timeout))
+        except Exception:
+            logger.warning("Could not write to shared cache", exc_info=True)
+
+    def _set_local(self, full_key: str, entry: tuple) -> None:
+        remaining = entry[1] - time.time()
+        if remaining > 0:
+            self.local.set(full_key, entry, min(remaining, self.local_timeout))
+
+    def _should_refresh(self, entry: tuple) -> bool:
+        _, expires_at, compute_time = entry
+        # 1 - random() is in (0, 1], so the log is defined and <= 0.
+        jitter = -compute_time * self.beta * math.log(1 - random.random())  # noqa: S311
+        return time.time() + jitter >= expires_at
+
+    def _compute(self, full_key: str, producer, timeout) -> Any:
+        started = time.monotonic()
+        value = producer()
+        self._set_entry(full_key, value, timeout, time.monotonic() - started)
+        return value
+
+    def _acquire(self, lock_key: str) -> bool:
+        try:
+            return self.shared.add(lock_key, 1, math.ceil(self.lock_timeout))
+        except Exception:
+            logger.warning("Shared cache unavailable", exc_info=True)
+            return True
+
+    def _release(self, lock_key: str) -> None:
+        try:
+            self.shared.delete(lock_key)
+        except Exception:
+            logger.warning("Could not release cache lock", exc_info=True)
+
+    def _wait_for(self, full_key: str) -> tuple | None:
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            try:
+                entry = self.shared.get(full_key)
+            except Exception:
+                return None
+            if entry is not None:
+                self._set_local(full_key, entry)
+                return entry
+        return None
+
+
+@functools.cache
+def tiered_cache() -> TieredCache:
+    """Process-wide TieredCache configured from the TIERED_CACHE_* settings."""
+    return TieredCache()
@@ -0,0 +1 @@
+"""Celery helpers shared across apps."""
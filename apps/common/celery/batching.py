@@ -0,0 +1,120 @@
+"""
+Producer-side batching for high-volume, fire-and-forget Celery tasks.
+
+Usage:
+
+    @batched_task(flush_every=500, flush_interval=2.0)
+    def record_page_views(batch):
+        # batch is a list of argument tuples: [(page_id, user_id), ...]
+        ...
+
+    record_page_views.delay(page.pk, user.pk)
+
+Each ``delay()`` call only appends to an in-process buffer. The buffer is sent
+as a single task message once it holds ``flush_every`` calls or
+``flush_interval`` seconds after the first buffered call, whichever comes
+first. Buffered calls are lost if the process is killed before a flush, so
+only use this for data that can tolerate that.
+"""
+
+import atexit
+import functools
+import logging
+import os
+import threading
+from collections.abc import Callable
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+class BatchedTask:
+    """Buffers calls for a Celery task that takes a list of argument tuples."""
+
+    def __init__(self, task, flush_every: int = 100, flush_interval: float = 1.0):
+        self.task = task
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._buffer: list[tuple] = []
+        self._lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+        atexit.register(self.flush)
+        # A forked child (prefork worker, gunicorn) must not send the parent's
+        # buffer a second time or wait on the parent's timer thread.
+        os.register_at_fork(after_in_child=self._reset)
+
+    def __repr__(self):
+        return f"<BatchedTask {self.name}>"
+
+    @property
+    def name(self) -> str:
+        return self.task.name
+
+    def delay(self, *args) -> None:
+        """Buffer one call, flushing if the buffer is full."""
+        with self._lock:
+            self._buffer.append(args)
+            if len(self._buffer) >= self.flush_every:
+                batch = self._take()
+            else:
+                batch = []
+                self._start_timer()
+        if batch:
+            self._send(batch)
+
+    def flush(self) -> None:
+        """Send everything buffered so far as one task."""
+        with self._lock:
+            batch = self._take()
+        if batch:
+            self._send(batch)
+
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def _take(self) -> list[tuple]:
+        batch, self._buffer = self._buffer, []
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return batch
+
+    def _start_timer(self) -> None:
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _send(self, batch: list[tuple]) -> None:
+        try:
+            self.task.delay(batch)
+        except Exception:
+            logger.exception(f"Dropped a batch of {len(batch)} calls to {self.name}")
+
+    def _reset(self) -> None:
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._timer = None
+
+
+def batched_task(
+    flush_every: int = 100, flush_interval: float = 1.0, **task_options
+) -> Callable[[Callable], BatchedTask]:
+    """
+    Turn ``func(batch)`` into a batched Celery task.
+
+    ``task_options`` are passed to ``shared_task``. The task keeps the name of
+    the decorated function, so it is routed and registered like any other task.
+    """
+
+    def decorator(func: Callable) -> BatchedTask:
+        @functools.wraps(func)
+        def run_batch(batch):
+            # Serializers like JSON turn the argument tuples into lists.
+            return func([tuple(args) for args in batch])
+
+        task = shared_task(**task_options)(run_batch)
+        return BatchedTask(task, flush_every=flush_every, flush_interval=flush_interval)
+
+    return decorator
@@ -0,0 +1,100 @@
+"""
+Deduplicated task execution.
+
+Usage:
+
+    @shared_task(base=IdempotentTask, idempotency_window=60 * 60)
+    def generate_invoice(order_id):
+        ...
+
+    # Key derived from the arguments:
+    generate_invoice.delay(order.pk)
+    # Or given explicitly:
+    generate_invoice.apply_async((order.pk,), headers={"idempotency_key": key})
+
+The first execution for a key takes a Redis lock, runs, and stores its result
+for ``idempotency_window`` seconds. Later executions within the window return
+the stored result without running. An execution that starts while another one
+holds the lock waits up to ``idempotency_wait_timeout`` seconds for that
+result. Failed and retried executions store nothing, so the next attempt runs.
+"""
+
+import hashlib
+import json
+import logging
+import time
+
+from celery import Task
+from redis.exceptions import LockError
+
+from apps.common import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class DuplicateTaskTimeoutError(Exception):
+    """A duplicate execution gave up waiting for the running one to finish."""
+
+
+class IdempotentTask(Task):
+    #: Seconds a finished result suppresses duplicates.
+    idempotency_window = 60 * 60
+    #: Seconds the lock is held at most; should exceed the longest run.
+    idempotency_lock_timeout = 10 * 60
+    #: Seconds a concurrent duplicate waits for the running execution.
+    idempotency_wait_timeout = 60
+    idempotency_poll_interval = 0.1
+
+    def idempotency_key(self, args, kwargs) -> str:
+        """Key identifying a call; by default a hash of the arguments."""
+        payload = json.dumps([args, kwargs], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def __call__(self, *args, **kwargs):
+        key = self._request_idempotency_key() or self.idempotency_key(args, kwargs)
+        client = redis_client.get_redis()
+        result_key = f"idempotency:{self.name}:{key}:result"
+        lock = client.lock(
+            f"idempotency:{self.name}:{key}:lock",
+            timeout=self.idempotency_lock_timeout,
+            blocking=False,
+        )
+
+        deadline = time.monotonic() + self.idempotency_wait_timeout
+        while True:
+            stored = client.get(result_key)
+            if stored is not None:
+                logger.info(f"Skipping duplicate {self.name} call ({key})")
+                return json.loads(stored)
+            if lock.acquire():
+                break
+            if time.monotonic() >= deadline:
+                raise DuplicateTaskTimeoutError(
+                    f"{self.name} call {key} is still running elsewhere"
+                )
+            time.sleep(self.idempotency_poll_interval)
+
+        try:
+            # Another execution may have finished between the check and the lock.
+            stored = client.get(result_key)
+            if stored is not None:
+                return json.loads(stored)
+            result = super().__call__(*args, **kwargs)
+            client.set(
+                result_key,
+                json.dumps(result, default=str),
+                ex=self.idempotency_window,
+            )
+            return result
+        finally:
+            try:
+                lock.release()
+            except LockError:
+                logger.warning(f"Lock for {self.name} call {key} expired while running")
+
+    def _request_idempotency_key(self) -> str | None:
+        request = self.request
+        key = getattr(request, "idempotency_key", None)
+        if key is None and request.headers:
+            key = request.headers.get("idempotency_key")
+        return key
@@ -0,0 +1,215 @@
+"""
+Per-task queue-wait and runtime metrics, aggregated across worker processes.
+
+Signal handlers record, for every task name:
+
+- how long a message waited between publishing (or its ETA) and the start of
+  execution (``queue_wait``),
+- how long it ran (``runtime``),
+- how many runs failed and how many were retried.
+
+Each process aggregates into an in-memory table and adds it to a Redis hash
+(``TASK_METRICS_KEY``) at most every ``TASK_METRICS_FLUSH_INTERVAL`` seconds,
+so recording costs a dict update per task and Redis sees one pipeline per
+interval. ``render_prometheus()`` turns the totals into the Prometheus text
+format; they are served by the ``task_metrics`` command and ``/metrics/``.
+
+Recording is enabled with TASK_METRICS_ENABLED (on by default when REDIS_URL
+is set).
+"""
+
+import bisect
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from celery import signals
+from django.conf import settings
+
+from apps.common import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds; the last bucket is +Inf.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+HISTOGRAMS = {
+    "queue_wait": "Seconds tasks waited in the queue before starting.",
+    "runtime": "Seconds tasks spent running.",
+}
+COUNTERS = {
+    "failures": "Task runs that raised an exception.",
+    "retries": "Task runs that asked to be retried.",
+}
+
+
+class TaskMetrics:
+    """In-process aggregation flushed to a Redis hash shared by all workers."""
+
+    def __init__(self):
+        self._pending: defaultdict[str, float] = defaultdict(float)
+        self._started: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def observe(self, metric: str, task: str, seconds: float) -> None:
+        bucket = bisect.bisect_left(BUCKETS, seconds)
+        le = str(BUCKETS[bucket]) if bucket < len(BUCKETS) else "+Inf"
+        with self._lock:
+            self._pending[f"{metric}_bucket|{task}|{le}"] += 1
+            self._pending[f"{metric}_sum|{task}"] += seconds
+            self._pending[f"{metric}_count|{task}"] += 1
+        self.maybe_flush()
+
+    def increment(self, metric: str, task: str) -> None:
+        with self._lock:
+            self._pending[f"{metric}|{task}"] += 1
+        self.maybe_flush()
+
+    def task_started(self, task_id: str) -> None:
+        self._started[task_id] = time.perf_counter()
+
+    def task_finished(self, task_id: str) -> float | None:
+        started = self._started.pop(task_id, None)
+        return None if started is None else time.perf_counter() - started
+
+    def maybe_flush(self) -> None:
+        if time.monotonic() - self._last_flush >= settings.TASK_METRICS_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(float)
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+        try:
+            pipe = redis_client.get_redis().pipeline(transaction=False)
+            for field, amount in pending.items():
+                pipe.hincrbyfloat(settings.TASK_METRICS_KEY, field, amount)
+            pipe.execute()
+        except Exception:
+            logger.warning("Could not flush task metrics", exc_info=True)
+
+    def _reset(self) -> None:
+        self._pending = defaultdict(float)
+        self._started = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+
+metrics = TaskMetrics()
+
+
+def _enabled() -> bool:
+    return settings.TASK_METRICS_ENABLED
+
+
+def _queued_since(request) -> float | None:
+    headers = request.headers or {}
+    published_at = getattr(request, "published_at", None) or headers.get("published_at")
+    if published_at is None:
+        return None
+    # Countdown/ETA tasks are held back on purpose; count from when they
+    # became due.
+    if request.eta:
+        eta = request.eta
+        if isinstance(eta, str):
+            eta = datetime.fromisoformat(eta)
+        return max(published_at, eta.timestamp())
+    return published_at
+
+
+@signals.before_task_publish.connect
+def _stamp_published_at(headers=None, **kwargs):
+    if headers is not None and _enabled():
+        headers.setdefault("published_at", time.time())
+
+
+@signals.task_prerun.connect
+def _task_prerun(task_id=None, task=None, **kwargs):
+    if not _enabled():
+        return
+    metrics.task_started(task_id)
+    queued_since = _queued_since(task.request)
+    if queued_since is not None:
+        metrics.observe("queue_wait", task.name, max(time.time() - queued_since, 0))
+
+
+@signals.task_postrun.connect
+def _task_postrun(task_id=None, task=None, **kwargs):
+    if not _enabled():
+        return
+    elapsed = metrics.task_finished(task_id)
+    if elapsed is not None:
+        metrics.observe("runtime", task.name, elapsed)
+
+
+@signals.task_failure.connect
+def _task_failure(sender=None, **kwargs):
+    if _enabled():
+        metrics.increment("failures", sender.name)
+
+
+@signals.task_retry.connect
+def _task_retry(sender=None, **kwargs):
+    if _enabled():
+        metrics.increment("retries", sender.name)
+
+
+@signals.worker_process_shutdown.connect
+@signals.worker_shutdown.connect
+def _flush_on_shutdown(**kwargs):
+    if _enabled():
+        metrics.flush()
+
+
+def collect() -> dict[str, dict[str, float]]:
+    """Return the totals from all processes as ``{series: {task|le: value}}``."""
+    totals: defaultdict[str, dict[str, float]] = defaultdict(dict)
+    raw = redis_client.get_redis().hgetall(settings.TASK_METRICS_KEY)
+    for field, value in raw.items():
+        series, labels = field.decode().split("|", 1)
+        totals[series][labels] = float(value)
+    return dict(totals)
+
+
+def reset() -> None:
+    redis_client.get_redis().delete(settings.TASK_METRICS_KEY)
+
+
+def _labels(task: str, le: str | None = None) -> str:
+    task = task.replace("\\", "\\\\").replace('"', '\\"')
+    if le is None:
+        return f'{{task="{task}"}}'
+    return f'{{task="{task}",le="{le}"}}'
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def render_prometheus(totals: dict[str, dict[str, float]]) -> str:
+    """Format ``collect()`` output in the Prometheus text exposition format."""
+    lines = []
+    for metric, help_text in HISTOGRAMS.items():
+        name = f"celery_task_{metric}_seconds"
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        buckets = totals.get(f"{metric}_bucket", {})
+        for task, count in sorted(totals.get(f"{metric}_count", {}).items()):
+            cumulative = 0.0
+            for le in [*map(str, BUCKETS), "+Inf"]:
+                cumulative += buckets.get(f"{task}|{le}", 0)
+                lines.append(f"{name}_bucket{_labels(task, le)} {_number(cumulative)}")
+            total = totals[f"{metric}_sum"][task]
+            lines.append(f"{name}_sum{_labels(task)} {_number(total)}")
+            lines.append(f"{name}_count{_labels(task)} {_number(count)}")
+    for metric, help_text in COUNTERS.items():
+        name = f"celery_task_{metric}_total"
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        for task, count in sorted(totals.get(metric, {}).items()):
+            lines.append(f"{name}{_labels(task)} {_number(count)}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,40 @@
+"""
+Task queues and their worker profiles.
+
+Tasks land on a queue in one of three ways, highest priority first:
+
+1. Explicitly, with ``@queue_task(CRITICAL)`` (or ``shared_task(queue=...)``).
+2. By module or naming convention, through the glob patterns in
+   ``CELERY_TASK_ROUTES`` (e.g. ``apps.*.reports.*`` goes to ``bulk``).
+3. Otherwise on ``CELERY_TASK_DEFAULT_QUEUE``.
+
+Each queue has a profile in ``CELERY_QUEUE_PROFILES`` that sizes its worker
+pool and sets prefetch and late acknowledgement. ``workers()`` in
+scripts/project_commands.py starts one pool per queue.
+"""
+
+from celery import shared_task
+from django.conf import settings
+
+CRITICAL = "critical"
+DEFAULT = "default"
+BULK = "bulk"
+
+
+def queue_task(queue: str, **options):
+    """
+    ``shared_task`` bound to ``queue``, with that queue's ``acks_late``.
+
+    Setting ``acks_late`` on the task keeps the profile's delivery guarantees
+    even when one worker consumes several queues.
+    """
+    acks_late = settings.CELERY_QUEUE_PROFILES[queue]["acks_late"]
+    options.setdefault("acks_late", acks_late)
+    options.setdefault("reject_on_worker_lost", acks_late)
+    return shared_task(queue=queue, **options)
+
+
+def worker_concurrency(queue: str, cpu_count: int) -> int:
+    """Number of pool processes for ``queue`` on a host with ``cpu_count`` CPUs."""
+    per_cpu = settings.CELERY_QUEUE_PROFILES[queue]["concurrency_per_cpu"]
+    return max(1, round(cpu_count * per_cpu))
@@ -0,0 +1,114 @@
+"""
+Database connection pool statistics.
+
+With DB_CONN_REUSE=pool every process has its own psycopg pool per database,
+so a scrape of one process says little. After a request or task, each process
+publishes its pool counters to Redis (at most every DB_POOL_STATS_INTERVAL
+seconds) under a key that expires if the process goes away, and /metrics/
+reports all of them, labelled by process.
+"""
+
+import json
+import logging
+import os
+import socket
+import time
+
+from celery import signals
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import connections
+
+from apps.common import redis_client
+
+logger = logging.getLogger(__name__)
+
+POOL_STATS_KEY = "db:pool:stats"
+# Point-in-time values; everything else psycopg reports is a running total.
+POOL_GAUGES = {
+    "pool_min": "Minimum connections the pool keeps open.",
+    "pool_max": "Maximum connections the pool may open.",
+    "pool_size": "Connections currently managed by the pool.",
+    "pool_available": "Idle connections ready to be handed out.",
+    "requests_waiting": "Threads currently waiting for a connection.",
+}
+POOL_COUNTERS = {
+    "requests_num": "Connection requests.",
+    "requests_queued": "Connection requests that had to wait.",
+    "requests_wait_ms": "Milliseconds spent waiting for a connection.",
+    "requests_errors": "Connection requests that timed out or failed.",
+    "returns_bad": "Connections returned to the pool in a bad state.",
+    "connections_num": "Connections opened to the server.",
+    "connections_ms": "Milliseconds spent opening connections.",
+    "connections_errors": "Failed connection attempts.",
+    "connections_lost": "Connections found broken by pool checks.",
+}
+
+_last_publish = 0.0
+
+
+def pool_stats() -> dict[str, dict[str, int]]:
+    """Return ``{alias: stats}`` for the pooled databases of this process."""
+    stats = {}
+    for alias in connections:
+        if not connections.settings[alias].get("OPTIONS", {}).get("pool"):
+            continue
+        pool = getattr(connections[alias], "pool", None)
+        if pool is not None:
+            stats[alias] = pool.get_stats()
+    return stats
+
+
+def publish_pool_stats(**kwargs) -> None:
+    global _last_publish
+    now = time.monotonic()
+    if not settings.REDIS_URL or now - _last_publish < settings.DB_POOL_STATS_INTERVAL:
+        return
+    _last_publish = now
+    stats = pool_stats()
+    if not stats:
+        return
+    key = f"{POOL_STATS_KEY}:{socket.gethostname()}:{os.getpid()}"
+    try:
+        redis_client.get_redis().set(
+            key, json.dumps(stats), ex=int(settings.DB_POOL_STATS_INTERVAL * 3)
+        )
+    except Exception:
+        logger.warning("Could not publish database pool stats", exc_info=True)
+
+
+request_finished.connect(publish_pool_stats)
+signals.task_postrun.connect(publish_pool_stats)
+
+
+def collect_pool_stats() -> dict[str, dict[str, dict[str, int]]]:
+    """Return ``{process: {alias: stats}}`` for every live process."""
+    client = redis_client.get_redis()
+    keys = sorted(client.scan_iter(f"{POOL_STATS_KEY}:*"))
+    if not keys:
+        return {}
+    prefix = len(POOL_STATS_KEY) + 1
+    return {
+        key.decode()[prefix:]: json.loads(value)
+        for key, value in zip(keys, client.mget(keys), strict=True)
+        if value is not None
+    }
+
+
+def render_pool_stats(stats: dict[str, dict[str, dict[str, int]]]) -> str:
+    """Format ``collect_pool_stats()`` output in the Prometheus text format."""
+    lines = []
+    for kind, names, suffix in (
+        ("gauge", POOL_GAUGES, ""),
+        ("counter", POOL_COUNTERS, "_total"),
+    ):
+        for stat, help_text in names.items():
+            name = f"db_pool_{stat}{suffix}"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            for process, aliases in stats.items():
+                for alias, values in sorted(aliases.items()):
+                    value = values.get(stat, 0)
+                    lines.append(
+                        f'{name}{{process="{process}",alias="{alias}"}} {value}'
+                    )
+    return "\n".join(lines) + "\n"
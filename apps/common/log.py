@@ -0,0 +1,179 @@
+"""
+Logging plumbing: queued handlers, JSON output and request IDs.
+
+The ``django`` and ``apps`` loggers write to a QueueHandler, so a log call on
+a request thread only formats the message and puts it on a queue. A listener
+thread per process runs the real handlers (console, rotating file), which is
+where the I/O and rotation happen. The queue is bounded by LOG_QUEUE_SIZE;
+when the listener falls that far behind, records are dropped (and counted in
+``QueueHandler.dropped``) rather than blocking requests.
+
+RequestIDMiddleware tags every record logged during a request with the
+request's ID, taken from a valid ``X-Request-ID`` header or generated, and
+echoes it back in the response. LOG_FORMAT=json switches both handlers to
+one JSON object per line. LOG_SAMPLE_RATES keeps only a fraction of DEBUG
+records from chatty loggers.
+"""
+
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import threading
+import uuid
+from datetime import UTC, datetime
+
+REQUEST_ID_HEADER = "X-Request-ID"
+REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+request_id: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "request_id", default=None
+)
+
+# Attributes every LogRecord has; anything else was passed in ``extra``.
+RECORD_ATTRIBUTES = frozenset(
+    {*vars(logging.LogRecord("", 0, "", 0, "", None, None)), "message", "request_id"}
+)
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler whose listener starts with the first record in each process.
+
+    Configure it through dictConfig with ``handlers`` (and optionally a
+    bounded ``queue``); dictConfig builds the QueueListener but leaves it
+    stopped. Starting lazily means the thread is created after any fork
+    (gunicorn with preload_app, Celery's prefork pool), and a forked child
+    gets a fresh queue instead of one whose locks may be held by the
+    parent's listener thread.
+    """
+
+    listener: logging.handlers.QueueListener
+
+    def __init__(self, queue):
+        super().__init__(queue)
+        self.dropped = 0
+        self._pid: int | None = None
+        self._start_lock = threading.Lock()
+
+    def emit(self, record):
+        if self._pid != os.getpid():
+            self._start()
+        super().emit(record)
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record):
+        # Unlike the base class, keep the message and traceback separate so
+        # the target handlers' formatters can lay them out themselves.
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def _start(self):
+        with self._start_lock:
+            pid = os.getpid()
+            if self._pid == pid:
+                return
+            if self._pid is not None:
+                self.queue = self.listener.queue = queue.Queue(self.queue.maxsize)
+                self.listener._thread = None
+            else:
+                atexit.register(self._stop)
+            self.listener.start()
+            self._pid = pid
+
+    def _stop(self):
+        if self._pid == os.getpid() and self.listener._thread is not None:
+            self.listener.stop()
+
+
+class RequestIDFilter(logging.Filter):
+    """Set ``record.request_id`` to the current request's ID, or ``-``."""
+
+    def filter(self, record):
+        record.request_id = request_id.get() or "-"
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep a fraction of low-level records from the given loggers.
+
+    ``rates`` maps logger names to the fraction of records to keep; a name
+    also covers its children, and the most specific name wins. Only records
+    at or below ``max_level`` are sampled.
+    """
+
+    def __init__(self, rates: dict[str, float] | None = None, max_level="DEBUG"):
+        super().__init__()
+        self.rates = dict(sorted((rates or {}).items(), key=lambda item: -len(item[0])))
+        self.max_level = logging._checkLevel(max_level)
+
+    def filter(self, record):
+        if record.levelno > self.max_level:
+            return True
+        for name, rate in self.rates.items():
+            if record.name == name or record.name.startswith(f"{name}."):
+                return random.random() < rate  # noqa: S311
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including ``extra`` fields."""
+
+    def format(self, record):
+        data = {
+            "timestamp": datetime.fromtimestamp(record.created, UTC).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exception"] = record.exc_text
+        if record.stack_info:
+            data["stack"] = record.stack_info
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRIBUTES and not key.startswith("_"):
+                data[key] = value
+        return json.dumps(data, default=str)
+
+
+class RequestIDMiddleware:
+    """Assign each request an ID for log correlation and return it as a header."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        value = request.headers.get(REQUEST_ID_HEADER, "")
+        if not REQUEST_ID_PATTERN.match(value):
+            value = uuid.uuid4().hex
+        request.id = value
+        token = request_id.set(value)
+        try:
+            response = self.get_response(request)
+        finally:
+            request_id.reset(token)
+        response[REQUEST_ID_HEADER] = value
+        return response
@@ -0,0 +1,67 @@
+"""
+Bounded in-process LRU cache with per-entry expiry.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+from typing import Any
+
+MISSING = object()
+DEFAULT_TIMEOUT = object()
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache holding at most ``maxsize`` entries.
+
+    Entries expire ``timeout`` seconds after they were set. Expired entries are
+    dropped lazily when read, and the least recently used entry is evicted when
+    the cache is full. Because every process has its own copy, keep timeouts
+    short for anything that can change: there is no cross-process invalidation.
+    """
+
+    def __init__(self, maxsize: int = 1024, timeout: float | None = 60):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._data: OrderedDict[Hashable, tuple[float | None, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        with self._lock:
+            try:
+                expires_at, value = self._data[key]
+            except KeyError:
+                return default
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, timeout: Any = DEFAULT_TIMEOUT) -> None:
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.timeout
+        expires_at = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_many(self, keys: Iterable[Hashable]) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
@@ -3,6 +3,7 @@ Reusable model and view mixins.
 """
 
 from django.db import models
+from django.http import Http404
 from django.utils import timezone
 from rest_framework import mixins, viewsets
 
@@ -69,3 +70,32 @@ class StandardizedResponseMixin(
         return APIResponse.success(
             message="Resource deleted successfully", status_code=204
         )
+
+
+class KeyLookupMixin:
+    """
+    Resolve detail views by ``key`` through the model's cached key lookup.
+
+    Works with DRF generic views and Django's single-object views. The object
+    is fetched with ``get_by_key`` on the model's default manager (see
+    apps.misc.models.KeyManager), so filters added in ``get_queryset()`` are
+    not applied; restrict access with permissions instead. DRF object
+    permissions are still checked.
+    """
+
+    lookup_field = "key"
+    lookup_url_kwarg: str | None = None
+
+    def get_object(self, queryset=None):
+        if queryset is None:
+            queryset = self.get_queryset()
+        model = queryset.model
+        key = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        try:
+            obj = model._default_manager.get_by_key(key)
+        except model.DoesNotExist as e:
+            raise Http404(f"No {model._meta.object_name} matches the given key.") from e
+
+        if hasattr(self, "check_object_permissions"):
+            self.check_object_permissions(self.request, obj)
+        return obj
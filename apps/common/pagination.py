@@ -1,9 +1,38 @@
+import hashlib
+
 from django.core.paginator import Paginator
 from django.db.models import QuerySet
+from django.utils.functional import cached_property
 
+from .cache import tiered_cache
 from .responses import APIResponse
 
 
+class CachedCountPaginator(Paginator):
+    """
+    Paginator that caches the ``COUNT(*)`` of its queryset in ``namespace``.
+
+    Counts are keyed by the query's SQL and parameters, so every filter
+    combination gets its own entry. Call
+    ``tiered_cache().invalidate_namespace(namespace)`` when the rows change,
+    or accept counts up to TIERED_CACHE_TIMEOUT seconds old.
+    """
+
+    def __init__(self, object_list, per_page, *, namespace: str, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.namespace = namespace
+
+    @cached_property
+    def count(self):
+        sql, params = self.object_list.query.sql_with_params()
+        digest = hashlib.sha256(repr((sql, params)).encode()).hexdigest()
+        return tiered_cache().get_or_set(
+            f"count:{digest}",
+            lambda: Paginator.count.func(self),
+            namespace=self.namespace,
+        )
+
+
 class PaginationUtility:
     @staticmethod
     def paginated(
@@ -13,6 +42,7 @@ class PaginationUtility:
         serializer_class=None,
         serializer_context: dict | None = None,
         message: str = "Data retrieved successfully",
+        count_namespace: str | None = None,
     ):
         """
         Paginated response with comprehensive metadata.
@@ -24,11 +54,18 @@ class PaginationUtility:
             serializer_class: DRF serializer for data transformation
             serializer_context: Context for serializer
             message: Success message
+            count_namespace: Cache the total count in this tiered cache
+                namespace instead of counting on every request
 
         Returns:
             Paginated response with metadata
         """
-        paginator = Paginator(queryset, per_page)
+        if count_namespace:
+            paginator = CachedCountPaginator(
+                queryset, per_page, namespace=count_namespace
+            )
+        else:
+            paginator = Paginator(queryset, per_page)
         page_obj = paginator.get_page(page)
 
         # Serialize data if serializer provided
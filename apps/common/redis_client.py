@@ -0,0 +1,17 @@
+"""
+Shared Redis client for features that need Redis primitives (locks, scripts)
+rather than the cache API.
+"""
+
+import redis
+from django.conf import settings
+
+_client: redis.Redis | None = None
+
+
+def get_redis() -> redis.Redis:
+    """Return the process-wide client for ``REDIS_URL``, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.REDIS_URL)
+    return _client
@@ -0,0 +1,148 @@
+"""
+Read-replica routing.
+
+With DB_REPLICA_URLS set, ReplicaRouter sends reads to a replica and writes to
+``default``. Reads only go to replicas where stale data is acceptable:
+
+- inside ``replica_reads()``, which ReplicaRoutingMiddleware enters for every
+  request; tasks, commands and the shell read from the primary unless they
+  opt in with the same context manager,
+- not in requests other than GET/HEAD/OPTIONS,
+- not once the current request has written, nor for DB_REPLICA_STICKY_SECONDS
+  afterwards for the same client (tracked with a cookie), so users see their
+  own writes,
+- not inside a transaction on the primary,
+- not on replicas lagging more than DB_REPLICA_MAX_LAG seconds, measured at
+  most every DB_REPLICA_LAG_CHECK_INTERVAL seconds per process.
+"""
+
+import contextlib
+import contextvars
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = "default"
+STICKY_COOKIE = "db_primary_until"
+
+# Seconds since the last replayed transaction, or 0 when fully caught up.
+POSTGRES_LAG_QUERY = """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+@dataclass
+class RoutingState:
+    pinned: bool = False
+    wrote: bool = False
+
+
+_state: contextvars.ContextVar[RoutingState | None] = contextvars.ContextVar(
+    "db_routing_state", default=None
+)
+_lag: dict[str, tuple[float, float]] = {}
+_lag_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def replica_reads(pinned: bool = False):
+    """Allow reads in this block to go to replicas; yields the routing state."""
+    state = RoutingState(pinned=pinned)
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+
+def replica_lag(alias: str) -> float:
+    """Replication lag of ``alias`` in seconds; infinite if it can't be measured."""
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return 0.0
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(POSTGRES_LAG_QUERY)
+            return float(cursor.fetchone()[0])
+    except Exception:
+        logger.warning(f"Could not measure replication lag of {alias}", exc_info=True)
+        return float("inf")
+
+
+def _current_lag(alias: str) -> float:
+    now = time.monotonic()
+    with _lag_lock:
+        checked_at, lag = _lag.get(alias, (None, 0.0))
+    if checked_at is None or now - checked_at >= settings.DB_REPLICA_LAG_CHECK_INTERVAL:
+        lag = replica_lag(alias)
+        with _lag_lock:
+            _lag[alias] = (now, lag)
+    return lag
+
+
+def healthy_replicas() -> list[str]:
+    return [
+        alias
+        for alias in settings.DB_REPLICAS
+        if _current_lag(alias) <= settings.DB_REPLICA_MAX_LAG
+    ]
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.pinned or connections[PRIMARY].in_atomic_block:
+            return PRIMARY
+        replicas = healthy_replicas()
+        return random.choice(replicas) if replicas else PRIMARY  # noqa: S311
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.pinned = state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
+
+
+class ReplicaRoutingMiddleware:
+    """Scope replica reads to the request and keep writers on the primary."""
+
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            sticky = float(request.COOKIES.get(STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            sticky = False
+        pinned = sticky or request.method not in self.SAFE_METHODS
+        with replica_reads(pinned=pinned) as state:
+            response = self.get_response(request)
+        if state.wrote:
+            window = settings.DB_REPLICA_STICKY_SECONDS
+            response.set_cookie(
+                STICKY_COOKIE,
+                str(time.time() + window),
+                max_age=window,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
@@ -0,0 +1,37 @@
+"""
+Summary statistics for benchmarks and load tests.
+"""
+
+import math
+from collections.abc import Iterable, Sequence
+
+
+def percentile(ordered: Sequence[float], percent: float) -> float:
+    """
+    Return the ``percent`` percentile of already sorted values.
+
+    Interpolates linearly between the two closest ranks, like numpy's default.
+    """
+    if not ordered:
+        raise ValueError("percentile() of an empty sequence")
+    rank = (len(ordered) - 1) * percent / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(
+    values: Iterable[float], percents: Iterable[float] = (50, 95, 99)
+) -> dict[str, float]:
+    """Count, mean, min, max and the given percentiles (as ``p50``, ...)."""
+    ordered = sorted(values)
+    if not ordered:
+        return {"count": 0}
+    summary = {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered),
+        "min": ordered[0],
+        "max": ordered[-1],
+    }
+    for percent in percents:
+        summary[f"p{percent:g}"] = percentile(ordered, percent)
+    return summary
@@ -0,0 +1,29 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden, HttpResponseNotFound
+from django.views.decorators.http import require_GET
+
+from apps.common.celery.metrics import collect, render_prometheus
+from apps.common.db import collect_pool_stats, render_pool_stats
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@require_GET
+def metrics(request):
+    """
+    Prometheus scrape endpoint.
+
+    Requires ``Authorization: Bearer <METRICS_TOKEN>``. Without a configured
+    token it is only served in DEBUG.
+    """
+    if not settings.METRICS_TOKEN:
+        if not settings.DEBUG:
+            return HttpResponseNotFound()
+    elif not hmac.compare_digest(
+        request.headers.get("Authorization", ""), f"Bearer {settings.METRICS_TOKEN}"
+    ):
+        return HttpResponseForbidden()
+    body = render_prometheus(collect()) + render_pool_stats(collect_pool_stats())
+    return HttpResponse(body, content_type=PROMETHEUS_CONTENT_TYPE)
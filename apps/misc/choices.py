@@ -1,16 +1,42 @@
+from django.db import models
+
+
 class ChoicesMeta(type):
-    def __getattribute__(cls, name):
-        if name and not name.startswith("_"):
-            try:
-                value = cls.__dict__[name]
-                if not callable(value):
-                    if isinstance(value, tuple):
-                        return value[0]
-                    else:
-                        return value
-            except KeyError:
-                pass
-        return super().__getattribute__(name)
+    """
+    Compile a Choices class into lookup tables when the class is created.
+
+    Every choice attribute is replaced by its database value, so reading
+    ``CarType.SEDAN`` is a plain class attribute lookup. The ordered choices,
+    the keys and the value/label maps are built here once instead of on every
+    call.
+    """
+
+    def __new__(mcs, name, bases, namespace, **kwargs):
+        members = {}
+        for base in reversed(bases):
+            members.update(getattr(base, "_members", {}))
+
+        for attr_name, value in list(namespace.items()):
+            if attr_name.startswith("_") or callable(value):
+                continue
+            if isinstance(value, classmethod | staticmethod | property):
+                continue
+            if isinstance(value, tuple):
+                db_value = value[0]
+                label = value[1] if len(value) > 1 else attr_name
+            else:
+                db_value, label = value, attr_name
+            members[attr_name] = (db_value, label)
+            namespace[attr_name] = db_value
+
+        cls = super().__new__(mcs, name, bases, namespace, **kwargs)
+        cls._members = members
+        cls._choices = tuple(members.values())
+        cls._keys = tuple(db_value for db_value, _ in cls._choices)
+        cls._key_set = frozenset(cls._keys)
+        cls._labels = dict(cls._choices)
+        cls._values = {label: db_value for db_value, label in cls._choices}
+        return cls
 
 
 class Choices(metaclass=ChoicesMeta):
@@ -19,12 +45,12 @@ class Choices(metaclass=ChoicesMeta):
     add is a choice. If you define as value a string, then the value is
     the database entry, while the property name is the display name. If
     you pass a tuple, the first element is the database entry, and the
-    second the display name.
+    second the display name. Choices keep their definition order.
 
     Usage:
 
     class CarType(Choices):
-        SUV = 'SUV',
+        SUV = 'SUV'
         SEDAN = ('SD', 'Sedan')
         HATCHBACK = ('HB', 'Hatchback')
         CONVERTIBLE = ('CV', 'Convertible')
@@ -33,24 +59,68 @@ class Choices(metaclass=ChoicesMeta):
     class Car(models.Model):
         type = models.CharField(max_length=10, choices=CarType.choices())
 
+        class Meta:
+            constraints = [CarType.check_constraint("type")]
+
 
     convertibles = Car.objects.filter(type=CarType.CONVERTIBLE)
+    CarType.label_for("CV")  # "Convertible"
     """
 
+    _members: dict[str, tuple]
+    _choices: tuple[tuple, ...]
+    _keys: tuple
+    _key_set: frozenset
+    _labels: dict
+    _values: dict
+
     @classmethod
-    def choices(cls):
-        for attr_name in dir(cls):
-            if attr_name.startswith("_"):
-                continue
-            if attr_name in ["keys", "choices"]:
-                continue
-            value = cls.__dict__[attr_name]
-            if not callable(value):
-                if isinstance(value, tuple):
-                    yield value
-                else:
-                    yield value, attr_name
+    def choices(cls) -> tuple[tuple, ...]:
+        return cls._choices
+
+    @classmethod
+    def keys(cls) -> tuple:
+        return cls._keys
+
+    @classmethod
+    def is_valid(cls, value) -> bool:
+        return value in cls._key_set
+
+    @classmethod
+    def label_for(cls, value, default=None):
+        return cls._labels.get(value, default)
+
+    @classmethod
+    def value_for(cls, label, default=None):
+        return cls._values.get(label, default)
+
+    @classmethod
+    def as_django_choices(cls) -> type[models.Choices]:
+        """
+        Return an equivalent Django ``TextChoices`` (or ``IntegerChoices``).
+
+        Built on first use and cached on the class, so classes that never need
+        it don't pay for creating an enum at import time.
+        """
+        if "_django_choices" not in cls.__dict__:
+            if all(isinstance(value, str) for value in cls._keys):
+                base: type[models.Choices] = models.TextChoices
+            elif all(type(value) is int for value in cls._keys):
+                base = models.IntegerChoices
+            else:
+                base = models.Choices
+            cls._django_choices = base(  # type: ignore[attr-defined]
+                cls.__name__,
+                [(attr, choice) for attr, choice in cls._members.items()],
+            )
+        return cls._django_choices  # type: ignore[attr-defined]
 
     @classmethod
-    def keys(cls):
-        return [choice[0] for choice in cls.choices()]
+    def check_constraint(
+        cls, field_name: str, name: str | None = None
+    ) -> models.CheckConstraint:
+        """Database check constraint limiting ``field_name`` to these keys."""
+        return models.CheckConstraint(
+            condition=models.Q(**{f"{field_name}__in": cls._keys}),
+            name=name or f"%(app_label)s_%(class)s_{field_name}_valid",
+        )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.common.celery.metrics import collect, render_prometheus, reset
+
+
+class Command(BaseCommand):
+    help = "Print per-task queue-wait and runtime metrics in Prometheus format"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset", action="store_true", help="Clear the collected metrics."
+        )
+
+    def handle(self, *args, **options):
+        if options["reset"]:
+            reset()
+            self.stdout.write("Task metrics cleared.")
+            return
+        self.stdout.write(render_prometheus(collect()), ending="")
@@ -1,10 +1,256 @@
+"""
+Celery load generator.
+
+Publishes ``task_echo`` at a target rate from several producer threads, then
+waits for the results and reports throughput and end-to-end latency (publish
+to finish) percentiles.
+
+Examples:
+
+    # Everything in-process, no Redis needed:
+    manage.py test_celery --broker memory:// --worker --count 5000
+
+    # Compare prefetch settings with a local filesystem transport:
+    manage.py test_celery --broker filesystem:// --worker --prefetch-multiplier 1
+
+    # Against the configured broker and already running workers:
+    manage.py test_celery --result-backend redis://cache/1 --rate 500 --producers 4
+
+Latency is only measured when results can be read back: with --worker (which
+defaults to an in-memory result backend) or with a result backend shared
+with the workers. To compare concurrency settings, run real workers against
+a Redis broker; the in-process worker is meant for the solo pool.
+"""
+
+import contextlib
+import json
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from celery.app.backends import by_url
+from celery.contrib.testing.worker import start_worker
+from celery.exceptions import TimeoutError as CeleryTimeoutError
+from celery.result import AsyncResult
 from django.core.management.base import BaseCommand
 
-from apps.misc.tasks import task_dummy
+from apps.common.stats import summarize
+from apps.misc.tasks import task_echo
+from conf.celery import app as celery_app
+
+LOCAL_TRANSPORTS = ("memory://", "filesystem://")
+
+
+@contextlib.contextmanager
+def conf_overrides(**values):
+    """Temporarily set Celery (``CELERY_``-prefixed) settings."""
+    conf = celery_app.conf
+    saved = {key: conf[key] for key in values if key in conf}
+    conf.update(values)
+    try:
+        yield
+    finally:
+        for key in values:
+            conf.pop(key, None)
+        conf.update(saved)
 
 
 class Command(BaseCommand):
-    help = "Closes the specified poll for voting"
+    help = "Publish tasks to Celery at a target rate and report throughput and latency"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=1000)
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=0,
+            help="Tasks/s across producers; 0 = no limit.",
+        )
+        parser.add_argument("--producers", type=int, default=1)
+        parser.add_argument("--queue", default="default")
+        parser.add_argument("--payload-size", type=int, default=0, help="Bytes.")
+        parser.add_argument("--serializer", default="json")
+        parser.add_argument("--timeout", type=float, default=60)
+        parser.add_argument(
+            "--broker", help="Broker URL, e.g. memory:// or filesystem://."
+        )
+        parser.add_argument(
+            "--data-dir",
+            default=str(Path(tempfile.gettempdir()) / "celery-loadtest"),
+            help="Message folder for the filesystem transport.",
+        )
+        parser.add_argument("--result-backend", help="Result backend URL.")
+        parser.add_argument(
+            "--worker", action="store_true", help="Consume with an in-process worker."
+        )
+        parser.add_argument("--pool", default="solo", help="In-process worker pool.")
+        parser.add_argument("--concurrency", type=int, default=1)
+        parser.add_argument("--prefetch-multiplier", type=int)
+        parser.add_argument("--json", action="store_true", help="Print JSON.")
 
     def handle(self, *args, **options):
-        task_dummy.delay(1, 2)
+        overrides = self._overrides(options)
+        backend_url = overrides.get(
+            "CELERY_RESULT_BACKEND", celery_app.conf.result_backend
+        )
+        with conf_overrides(**overrides), self._worker(options):
+            started = time.perf_counter()
+            results = self._publish(options)
+            publish_time = time.perf_counter() - started
+            report = {
+                "count": options["count"],
+                "producers": options["producers"],
+                "rate": options["rate"],
+                "serializer": options["serializer"],
+                "payload_size": options["payload_size"],
+                "publish_seconds": publish_time,
+                "publish_rate": options["count"] / publish_time,
+            }
+            if backend_url:
+                report.update(self._collect(results, backend_url, options["timeout"]))
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self._print(report)
+
+    def _overrides(self, options) -> dict:
+        overrides = {}
+        broker = options["broker"]
+        if broker:
+            overrides["CELERY_BROKER_URL"] = broker
+        if broker and broker.startswith(LOCAL_TRANSPORTS):
+            # Local transports are polled, once a second by default.
+            transport_options: dict = {"polling_interval": 0.001}
+            if broker.startswith("filesystem://"):
+                folder = Path(options["data_dir"])
+                folder.mkdir(parents=True, exist_ok=True)
+                transport_options["data_folder_in"] = str(folder)
+                transport_options["data_folder_out"] = str(folder)
+                transport_options["control_folder"] = str(folder / "control")
+            overrides["CELERY_BROKER_TRANSPORT_OPTIONS"] = transport_options
+        if options["result_backend"]:
+            overrides["CELERY_RESULT_BACKEND"] = options["result_backend"]
+        elif options["worker"]:
+            overrides["CELERY_RESULT_BACKEND"] = "cache+memory://"
+        if options["prefetch_multiplier"] is not None:
+            overrides["CELERY_WORKER_PREFETCH_MULTIPLIER"] = options[
+                "prefetch_multiplier"
+            ]
+        if options["serializer"] != "json":
+            overrides["CELERY_ACCEPT_CONTENT"] = ["json", options["serializer"]]
+        return overrides
+
+    def _worker(self, options):
+        if not options["worker"]:
+            return contextlib.nullcontext()
+        broker = options["broker"] or celery_app.conf.broker_url
+        if options["pool"] != "solo" and broker.startswith(LOCAL_TRANSPORTS):
+            # Polled transports run the worker's synchronous loop, which only
+            # acks messages finished by pool threads between polls.
+            self.stderr.write(
+                f"The {options['pool']} pool stalls once prefetch is full on "
+                "local transports; use --pool solo or a Redis broker."
+            )
+        return start_worker(
+            celery_app,
+            pool=options["pool"],
+            concurrency=options["concurrency"],
+            queues=[options["queue"]],
+            perform_ping_check=False,
+            loglevel="WARNING",
+        )
+
+    def _publish(self, options) -> list[str]:
+        task_ids: list[str] = []
+        producers = options["producers"]
+        per_producer, extra = divmod(options["count"], producers)
+        rate = options["rate"] / producers if options["rate"] else 0
+        publish_options = {
+            "queue": options["queue"],
+            "serializer": options["serializer"],
+        }
+        payload = "x" * options["payload_size"]
+
+        def produce(count):
+            interval = 1 / rate if rate else 0
+            next_at = time.perf_counter()
+            for _ in range(count):
+                if interval:
+                    time.sleep(max(next_at - time.perf_counter(), 0))
+                    next_at += interval
+                result = task_echo.apply_async(
+                    (time.time(), payload), **publish_options
+                )
+                task_ids.append(result.id)
+
+        threads = [
+            threading.Thread(target=produce, args=(per_producer + (i < extra),))
+            for i in range(producers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return task_ids
+
+    def _collect(self, task_ids: list[str], backend_url: str, timeout: float) -> dict:
+        backend_cls, url = by_url(backend_url, celery_app.loader)
+        backend = backend_cls(app=celery_app, url=url)
+        deadline = time.monotonic() + timeout
+        finished = []
+        failed = 0
+        for task_id in task_ids:
+            result = AsyncResult(task_id, backend=backend, app=celery_app)
+            try:
+                value = result.get(
+                    timeout=max(deadline - time.monotonic(), 0.01),
+                    interval=0.01,
+                    propagate=False,
+                )
+            except CeleryTimeoutError:
+                continue
+            if result.successful():
+                finished.append(value)
+            else:
+                failed += 1
+
+        report: dict = {"completed": len(finished), "failed": failed}
+        if finished:
+            first_sent = min(value["sent_at"] for value in finished)
+            last_finished = max(value["finished_at"] for value in finished)
+            duration = last_finished - first_sent
+            report["seconds"] = duration
+            report["throughput"] = len(finished) / duration if duration else 0
+            report["latency_ms"] = summarize(
+                (value["finished_at"] - value["sent_at"]) * 1000 for value in finished
+            )
+        return report
+
+    def _print(self, report: dict) -> None:
+        self.stdout.write(
+            f"Published {report['count']} tasks in {report['publish_seconds']:.2f}s "
+            f"({report['publish_rate']:.0f} tasks/s) from "
+            f"{report['producers']} producer(s)"
+        )
+        if "completed" not in report:
+            self.stdout.write(
+                "No result backend configured: pass --result-backend or --worker "
+                "to measure latency."
+            )
+            return
+        self.stdout.write(
+            f"Completed {report['completed']}/{report['count']} "
+            f"({report['failed']} failed)"
+        )
+        if report["completed"]:
+            latency = report["latency_ms"]
+            self.stdout.write(
+                f"Throughput: {report['throughput']:.0f} tasks/s over "
+                f"{report['seconds']:.2f}s"
+            )
+            self.stdout.write(
+                f"Latency (ms): p50 {latency['p50']:.1f}  p95 {latency['p95']:.1f}  "
+                f"p99 {latency['p99']:.1f}  max {latency['max']:.1f}"
+            )
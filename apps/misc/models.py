@@ -1,6 +1,41 @@
+import copy
+import functools
+import logging
+import os
+import time
 import uuid
+from collections.abc import Iterable
 
-from django.db import models
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, models, router, transaction
+
+from apps.common.lru import MISSING, LRUCache
+
+logger = logging.getLogger(__name__)
+
+# How many fresh keys save() tries before giving up on a unique violation.
+KEY_GENERATION_ATTEMPTS = 5
+
+# Cached in place of a row for keys that don't exist.
+KEY_NOT_FOUND = "__key_not_found__"
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Generate a time-ordered UUID (RFC 9562, version 7).
+
+    The first 48 bits are a millisecond Unix timestamp, so keys generated
+    close together sort next to each other and inserts append to the right
+    edge of the index instead of landing on random pages like uuid4 keys do.
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= int.from_bytes(os.urandom(10), "big")
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # version 7
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # RFC 4122 variant
+    return uuid.UUID(int=value)
 
 
 class TimestampedModel(models.Model):
@@ -11,8 +46,222 @@ class TimestampedModel(models.Model):
         abstract = True
 
 
-class KeyModel(TimestampedModel):
-    objects = models.Manager()
+class KeyQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        """
+        Assign keys to objects that don't have one, then bulk insert them.
+
+        bulk_create() bypasses save(), so without this every object would be
+        inserted with an empty key. Generated keys are not retried on
+        collision here; with 122 (uuid4) or 74 (uuid7, per millisecond)
+        random bits that is not a practical concern.
+        """
+        objs = list(objs)
+        for obj in objs:
+            if not obj.key:
+                obj.key = obj.generate_key()
+        created = super().bulk_create(objs, *args, **kwargs)
+        # New keys may have been cached as missing.
+        keys = [obj.key for obj in objs]
+        transaction.on_commit(
+            lambda: invalidate_cached_keys(self.model, keys), using=self.db
+        )
+        return created
+
+
+@functools.cache
+def _local_key_cache() -> LRUCache:
+    return LRUCache(
+        maxsize=settings.KEY_CACHE_LOCAL_MAXSIZE,
+        timeout=settings.KEY_CACHE_LOCAL_TIMEOUT,
+    )
+
+
+def _key_cache_key(model, key) -> str:
+    return f"key:{model._meta.label_lower}:{key}"
+
+
+def _cache_locally(cache_key: str, value) -> None:
+    if value == KEY_NOT_FOUND:
+        _local_key_cache().set(cache_key, value, settings.KEY_CACHE_NEGATIVE_TIMEOUT)
+    else:
+        _local_key_cache().set(cache_key, value)
+
+
+def invalidate_cached_keys(model, keys: Iterable) -> None:
+    """
+    Drop cached lookups for ``keys`` from this process and the shared cache.
+
+    Other processes keep their local copy until KEY_CACHE_LOCAL_TIMEOUT runs
+    out, so that timeout bounds how stale a lookup can be after a save.
+    """
+    key_field = model._meta.get_field("key")
+    cache_keys = [_key_cache_key(model, key_field.to_python(key)) for key in keys]
+    if not cache_keys:
+        return
+    _local_key_cache().delete_many(cache_keys)
+    try:
+        caches[settings.KEY_CACHE_ALIAS].delete_many(cache_keys)
+    except Exception:
+        logger.warning("Could not invalidate cached keys", exc_info=True)
+
+
+class KeyManager(models.Manager.from_queryset(KeyQuerySet)):  # type: ignore[misc]
+    def get_by_key(self, key):
+        """
+        Return the object with the given key, raising DoesNotExist if none.
+
+        Lookups go through a bounded in-process LRU and then the shared cache
+        (KEY_CACHE_ALIAS, Redis in production) before hitting the database.
+        Missing keys are cached for KEY_CACHE_NEGATIVE_TIMEOUT seconds.
+        """
+        try:
+            return self.get_many_by_key([key])[key]
+        except KeyError:
+            raise self.model.DoesNotExist(
+                f"{self.model._meta.object_name} matching key does not exist."
+            ) from None
+
+    def get_many_by_key(self, keys: Iterable) -> dict:
+        """
+        Resolve many keys at once, returning ``{key: object}`` for those found.
+
+        Keys missing from both cache tiers are fetched with a single
+        ``key IN (...)`` query. Returned objects are copies, so callers can
+        modify them without affecting the cache.
+        """
+        key_field = self.model._meta.get_field("key")
+        values = {}
+        wanted: dict[str, list] = {}
+        for key in keys:
+            try:
+                value = key_field.to_python(key)
+            except ValidationError:
+                continue
+            cache_key = _key_cache_key(self.model, value)
+            values[cache_key] = value
+            wanted.setdefault(cache_key, []).append(key)
+
+        local_cache = _local_key_cache()
+        found = {}
+        pending = []
+        for cache_key in wanted:
+            cached = local_cache.get(cache_key)
+            if cached is MISSING:
+                pending.append(cache_key)
+            elif cached != KEY_NOT_FOUND:
+                found[cache_key] = cached
+
+        if pending:
+            shared_cache = caches[settings.KEY_CACHE_ALIAS]
+            try:
+                shared = shared_cache.get_many(pending)
+            except Exception:
+                logger.warning("Key cache unavailable", exc_info=True)
+                shared = {}
+            for cache_key, cached in shared.items():
+                _cache_locally(cache_key, cached)
+                if cached != KEY_NOT_FOUND:
+                    found[cache_key] = cached
+            pending = [cache_key for cache_key in pending if cache_key not in shared]
+
+        if pending:
+            rows = {
+                _key_cache_key(self.model, obj.key): obj
+                for obj in self.get_queryset().filter(
+                    key__in=[values[cache_key] for cache_key in pending]
+                )
+            }
+            to_cache = {
+                cache_key: rows.get(cache_key, KEY_NOT_FOUND) for cache_key in pending
+            }
+            self._store_in_cache(to_cache)
+            found.update(rows)
+
+        return {
+            key: copy.copy(obj)
+            for cache_key, obj in found.items()
+            for key in wanted[cache_key]
+        }
+
+    def _store_in_cache(self, entries: dict) -> None:
+        for cache_key, value in entries.items():
+            _cache_locally(cache_key, value)
+        found = {k: v for k, v in entries.items() if v != KEY_NOT_FOUND}
+        missing = {k: v for k, v in entries.items() if v == KEY_NOT_FOUND}
+        shared_cache = caches[settings.KEY_CACHE_ALIAS]
+        try:
+            if found:
+                shared_cache.set_many(found, settings.KEY_CACHE_TIMEOUT)
+            if missing:
+                shared_cache.set_many(missing, settings.KEY_CACHE_NEGATIVE_TIMEOUT)
+        except Exception:
+            logger.warning("Could not populate key cache", exc_info=True)
+
+
+class BaseKeyModel(TimestampedModel):
+    """
+    Shared key assignment for KeyModel and UUIDKeyModel.
+
+    Subclasses define the ``key`` field and ``generate_key()``. Uniqueness is
+    enforced by the database: save() inserts straight away and only picks a
+    new key if the insert hits the unique constraint on ``key``.
+    """
+
+    objects = KeyManager()
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def generate_key(cls):
+        raise NotImplementedError
+
+    def save(self, **kwargs):
+        using = kwargs.get("using") or router.db_for_write(
+            self.__class__, instance=self
+        )
+        if self.key:
+            super().save(**kwargs)
+        else:
+            self._save_with_new_key(using, kwargs)
+        self._invalidate_cached_key(using)
+
+    def delete(self, *args, **kwargs):
+        using = kwargs.get("using") or router.db_for_write(
+            self.__class__, instance=self
+        )
+        result = super().delete(*args, **kwargs)
+        self._invalidate_cached_key(using)
+        return result
+
+    def _save_with_new_key(self, using, save_kwargs):
+        for attempt in range(1, KEY_GENERATION_ATTEMPTS + 1):
+            self.key = self.generate_key()
+            try:
+                # Savepoint so a collision doesn't break an outer transaction.
+                with transaction.atomic(using=using):
+                    super().save(**save_kwargs)
+                return
+            except IntegrityError:
+                key_taken = (
+                    self.__class__._base_manager.using(using)
+                    .filter(key=self.key)
+                    .exists()
+                )
+                if not key_taken or attempt == KEY_GENERATION_ATTEMPTS:
+                    self.key = self._meta.get_field("key").get_default()
+                    raise
+
+    def _invalidate_cached_key(self, using):
+        # After commit, so a concurrent lookup can't re-cache the old row.
+        key = self.key
+        transaction.on_commit(
+            lambda: invalidate_cached_keys(self.__class__, [key]), using=using
+        )
+
+
+class KeyModel(BaseKeyModel):
     key = models.CharField(
         max_length=255, unique=True, db_index=True, null=False, blank=True
     )
@@ -20,18 +269,37 @@ class KeyModel(TimestampedModel):
     class Meta:
         abstract = True
 
+    @classmethod
+    def generate_key(cls) -> str:
+        return str(uuid.uuid4())
+
     @property
     def short_key(self):
         return self.key[:8]
 
-    def save(self, **kwargs):
-        if not self.key:
-            while True:
-                new_key = str(uuid.uuid4())
-                try:
-                    self.__class__.objects.get(key=new_key)
-                    continue
-                except self.__class__.DoesNotExist:
-                    self.key = new_key
-                    break
-        super().save(**kwargs)
+
+class UUIDKeyModel(BaseKeyModel):
+    """
+    KeyModel variant that stores the key as a native UUID.
+
+    On PostgreSQL this is a 16-byte ``uuid`` column instead of a 36-character
+    varchar, roughly halving the size of the unique index. Keys are UUIDv7 by
+    default so inserts cluster at the end of the index; override
+    ``generate_key`` to return ``uuid.uuid4()`` if creation time must not be
+    derivable from the key.
+    """
+
+    key = models.UUIDField(unique=True, null=False, blank=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def generate_key(cls) -> uuid.UUID:
+        return uuid7()
+
+    @property
+    def short_key(self):
+        # The leading hex digits of a UUIDv7 are the timestamp, so take the
+        # random tail instead.
+        return self.key.hex[-8:]
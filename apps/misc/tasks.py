@@ -1,4 +1,5 @@
 import logging
+import time
 
 from celery import shared_task
 
@@ -8,3 +9,9 @@ logger = logging.getLogger(__name__)
 @shared_task
 def task_dummy(arg_a: object, arg_b: object) -> None:
     logger.info(f"Called task_dummy with a:{arg_a} b:{arg_b}")
+
+
+@shared_task
+def task_echo(sent_at: float, payload: str = "") -> dict:
+    """Load-test task: reports when it ran so the sender can measure latency."""
+    return {"sent_at": sent_at, "finished_at": time.time()}
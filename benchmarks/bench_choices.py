@@ -0,0 +1,41 @@
+"""
+Microbenchmark for apps.misc.choices.
+
+Run from the project root:
+
+    python -m benchmarks.bench_choices
+"""
+
+import timeit
+
+from apps.misc.choices import Choices
+
+
+class CarType(Choices):
+    SUV = "SUV"
+    SEDAN = ("SD", "Sedan")
+    HATCHBACK = ("HB", "Hatchback")
+    CONVERTIBLE = ("CV", "Convertible")
+    COUPE = ("CP", "Coupe")
+    PICKUP = ("PU", "Pickup")
+    MINIVAN = ("MV", "Minivan")
+    WAGON = ("WG", "Wagon")
+
+
+CASES = {
+    "attribute access": lambda: CarType.CONVERTIBLE,
+    "choices()": lambda: tuple(CarType.choices()),
+    "keys()": lambda: CarType.keys(),
+    "is_valid()": lambda: CarType.is_valid("CV"),
+    "label_for()": lambda: CarType.label_for("CV"),
+}
+
+
+def main(number: int = 100_000) -> None:
+    for name, func in CASES.items():
+        best = min(timeit.repeat(func, number=number, repeat=5))
+        print(f"{name:<20} {best / number * 1e9:10.1f} ns/call")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -60,6 +60,100 @@ LOGIN_REDIRECT_URL = env("LOGIN_REDIRECT_URL", default="/")
 DJANGO_DB_URL = env.db("DB_URL")
 DATABASES = {"default": DJANGO_DB_URL}
 
+# "web" or "worker" (Celery); web and worker processes reuse connections
+# differently. WEB_THREADS is how many requests a web process serves at once.
+PROCESS_TYPE = env("PROCESS_TYPE", default="web")
+assert PROCESS_TYPE in ["web", "worker"]  # noqa: B101
+WEB_THREADS = env.int("WEB_THREADS", default=1)
+
+# Connection reuse: "pool" keeps a psycopg pool per process (PostgreSQL only),
+# "persistent" keeps each thread's connection for DB_CONN_MAX_AGE seconds with
+# health checks, "off" connects per request. A prefork Celery process runs one
+# task at a time, so a pool gains it nothing over a persistent connection.
+_is_postgres = DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql"
+if PROCESS_TYPE == "worker":
+    DB_CONN_REUSE = env("DB_CONN_REUSE_WORKER", default="persistent")
+    _db_threads = 1
+else:
+    DB_CONN_REUSE = env(
+        "DB_CONN_REUSE_WEB", default="pool" if _is_postgres else "persistent"
+    )
+    _db_threads = WEB_THREADS
+assert DB_CONN_REUSE in ["pool", "persistent", "off"]  # noqa: B101
+
+if DB_CONN_REUSE == "pool" and _is_postgres:
+    # Each thread holds at most one connection, so the pool never needs more
+    # than one per thread; the server sees processes * DB_POOL_MAX_SIZE.
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"].setdefault("OPTIONS", {})["pool"] = {
+        "min_size": env.int("DB_POOL_MIN_SIZE", default=1),
+        "max_size": env.int("DB_POOL_MAX_SIZE", default=_db_threads),
+        "timeout": env.float("DB_POOL_TIMEOUT", default=10.0),
+        "max_idle": env.float("DB_POOL_MAX_IDLE", default=300.0),
+        "max_lifetime": env.float("DB_POOL_MAX_LIFETIME", default=3600.0),
+    }
+elif DB_CONN_REUSE != "off":
+    DATABASES["default"]["CONN_MAX_AGE"] = env.int("DB_CONN_MAX_AGE", default=600)
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+
+# How often each process publishes its pool statistics for /metrics/.
+DB_POOL_STATS_INTERVAL = env.float("DB_POOL_STATS_INTERVAL", default=10.0)
+
+# Read replicas (see apps/common/routers.py). Reads in web requests go to a
+# replica unless the request (or, for DB_REPLICA_STICKY_SECONDS, the client)
+# wrote, or the replica lags more than DB_REPLICA_MAX_LAG seconds.
+DB_REPLICA_URLS = env.list("DB_REPLICA_URLS", default=[])
+DB_REPLICAS = []
+for _index, _url in enumerate(DB_REPLICA_URLS, start=1):
+    # Same connection reuse as the primary.
+    _replica = env.db_url_config(_url)
+    for _key in ("CONN_MAX_AGE", "CONN_HEALTH_CHECKS"):
+        if _key in DATABASES["default"]:
+            _replica[_key] = DATABASES["default"][_key]
+    if "pool" in DATABASES["default"].get("OPTIONS", {}):
+        _replica.setdefault("OPTIONS", {})["pool"] = DATABASES["default"]["OPTIONS"][
+            "pool"
+        ]
+    _replica["TEST"] = {"MIRROR": "default"}
+    DATABASES[f"replica{_index}"] = _replica
+    DB_REPLICAS.append(f"replica{_index}")
+if DB_REPLICAS:
+    DATABASE_ROUTERS = ["apps.common.routers.ReplicaRouter"]
+DB_REPLICA_STICKY_SECONDS = env.int("DB_REPLICA_STICKY_SECONDS", default=5)
+DB_REPLICA_MAX_LAG = env.float("DB_REPLICA_MAX_LAG", default=2.0)
+DB_REPLICA_LAG_CHECK_INTERVAL = env.float("DB_REPLICA_LAG_CHECK_INTERVAL", default=5.0)
+
+# -----------------------------------------------------------------------------
+# Cache
+# -----------------------------------------------------------------------------
+REDIS_URL = env("REDIS_URL", default="")
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+    }
+    if REDIS_URL
+    else {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+# KeyManager.get_by_key: in-process LRU in front of the shared cache
+KEY_CACHE_ALIAS = "default"
+KEY_CACHE_TIMEOUT = env.int("KEY_CACHE_TIMEOUT", default=60 * 60)
+KEY_CACHE_NEGATIVE_TIMEOUT = env.int("KEY_CACHE_NEGATIVE_TIMEOUT", default=30)
+KEY_CACHE_LOCAL_MAXSIZE = env.int("KEY_CACHE_LOCAL_MAXSIZE", default=1024)
+KEY_CACHE_LOCAL_TIMEOUT = env.int("KEY_CACHE_LOCAL_TIMEOUT", default=60)
+
+# apps.common.cache.TieredCache: in-process LRU in front of the shared cache
+TIERED_CACHE_ALIAS = "default"
+TIERED_CACHE_TIMEOUT = env.int("TIERED_CACHE_TIMEOUT", default=5 * 60)
+TIERED_CACHE_LOCAL_MAXSIZE = env.int("TIERED_CACHE_LOCAL_MAXSIZE", default=4096)
+TIERED_CACHE_LOCAL_TIMEOUT = env.int("TIERED_CACHE_LOCAL_TIMEOUT", default=5)
+TIERED_CACHE_LOCK_TIMEOUT = env.int("TIERED_CACHE_LOCK_TIMEOUT", default=10)
+
+# Read sessions from the shared cache, falling back to the database.
+if REDIS_URL:
+    SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+
 # -----------------------------------------------------------------------------
 # Applications configuration
 # -----------------------------------------------------------------------------
@@ -80,6 +174,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "apps.common.log.RequestIDMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -89,6 +184,9 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+if DB_REPLICAS:
+    MIDDLEWARE.insert(2, "apps.common.routers.ReplicaRoutingMiddleware")
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
@@ -157,7 +255,36 @@ if USE_S3_STATIC_STORAGE:
 # Celery
 # -----------------------------------------------------------------------------
 CELERY_BROKER_URL = env("CELERY_BROKER_URL", default="redis://cache")
-CELERY_TASK_ALWAYS_EAGER = env("CELERY_TASK_ALWAYS_EAGER", default=False)
+CELERY_TASK_ALWAYS_EAGER = env.bool("CELERY_TASK_ALWAYS_EAGER", default=False)
+
+# Queues and their worker profiles (see apps/common/celery/queues.py).
+# critical: short, user-facing tasks (emails); never stuck behind bulk work.
+# bulk: slow batch work (reports, exports); one task per process at a time.
+CELERY_QUEUE_PROFILES = {
+    "critical": {"concurrency_per_cpu": 2, "prefetch_multiplier": 1, "acks_late": True},
+    "default": {"concurrency_per_cpu": 2, "prefetch_multiplier": 4, "acks_late": False},
+    "bulk": {"concurrency_per_cpu": 1, "prefetch_multiplier": 1, "acks_late": True},
+}
+CELERY_TASK_QUEUES = {queue: {} for queue in CELERY_QUEUE_PROFILES}
+CELERY_TASK_DEFAULT_QUEUE = "default"
+CELERY_TASK_ROUTES = {
+    "apps.*.reports.*": {"queue": "bulk"},
+    "apps.*.tasks.send_*": {"queue": "critical"},
+}
+
+# Workers started for a single queue apply that queue's profile.
+CELERY_WORKER_QUEUE = env("CELERY_WORKER_QUEUE", default="default")
+_worker_profile = CELERY_QUEUE_PROFILES[CELERY_WORKER_QUEUE]
+CELERY_WORKER_PREFETCH_MULTIPLIER = _worker_profile["prefetch_multiplier"]
+CELERY_TASK_ACKS_LATE = _worker_profile["acks_late"]
+CELERY_TASK_REJECT_ON_WORKER_LOST = _worker_profile["acks_late"]
+
+# Per-task queue-wait/runtime metrics (see apps/common/celery/metrics.py)
+TASK_METRICS_ENABLED = env.bool("TASK_METRICS_ENABLED", default=bool(REDIS_URL))
+TASK_METRICS_KEY = "celery:metrics"
+TASK_METRICS_FLUSH_INTERVAL = env.float("TASK_METRICS_FLUSH_INTERVAL", default=5.0)
+# Bearer token for /metrics/; without one the endpoint only answers in DEBUG.
+METRICS_TOKEN = env("METRICS_TOKEN", default="")
 
 # -----------------------------------------------------------------------------
 # Django Debug Toolbar
@@ -182,20 +309,39 @@ if USE_DJANGO_EXTENSIONS:
 # Logging
 # -----------------------------------------------------------------------------
 LOGS_ROOT = env("LOGS_ROOT", default=root_path("logs"))
+# "text" or "json" (one object per line, for log shippers)
+LOG_FORMAT = env("LOG_FORMAT", default="text")
+assert LOG_FORMAT in ["text", "json"]  # noqa: B101
+# Records waiting for the log writer thread before new ones are dropped.
+LOG_QUEUE_SIZE = env.int("LOG_QUEUE_SIZE", default=10_000)
+# Fraction of DEBUG records kept per logger, e.g. "apps.misc=0.1"
+LOG_SAMPLE_RATES = env.dict("LOG_SAMPLE_RATES", cast={"value": float}, default={})
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
     "formatters": {
-        "console_format": {"format": "%(name)-12s %(levelname)-8s %(message)s"},
+        "console_format": {
+            "format": "%(name)-12s %(levelname)-8s [%(request_id)s] %(message)s"
+        },
         "file_format": {
-            "format": "%(asctime)s %(name)-12s %(levelname)-8s %(message)s"
+            "format": (
+                "%(asctime)s %(name)-12s %(levelname)-8s [%(request_id)s] %(message)s"
+            )
+        },
+        "json": {"()": "apps.common.log.JSONFormatter"},
+    },
+    "filters": {
+        "request_id": {"()": "apps.common.log.RequestIDFilter"},
+        "sampling": {
+            "()": "apps.common.log.SamplingFilter",
+            "rates": LOG_SAMPLE_RATES,
         },
     },
     "handlers": {
         "console": {
             "level": "DEBUG",
             "class": "logging.StreamHandler",
-            "formatter": "console_format",
+            "formatter": "json" if LOG_FORMAT == "json" else "console_format",
         },
         "file": {
             "level": "INFO",
@@ -203,18 +349,26 @@ LOGGING = {
             "filename": os.path.join(LOGS_ROOT, "django.log"),
             "maxBytes": 1024 * 1024 * 15,  # 15MB
             "backupCount": 10,
-            "formatter": "file_format",
+            "formatter": "json" if LOG_FORMAT == "json" else "file_format",
+        },
+        # Hands records to a background thread that writes to console and file.
+        "queue": {
+            "class": "apps.common.log.QueueHandler",
+            "handlers": ["console", "file"],
+            "queue": {"()": "queue.Queue", "maxsize": LOG_QUEUE_SIZE},
+            "respect_handler_level": True,
+            "filters": ["request_id", "sampling"],
         },
     },
     "loggers": {
         "django": {
             "level": "INFO",
-            "handlers": ["console", "file"],
+            "handlers": ["queue"],
             "propagate": False,
         },
         "apps": {
             "level": "DEBUG",
-            "handlers": ["console", "file"],
+            "handlers": ["queue"],
             "propagate": False,
         },
     },
@@ -4,9 +4,12 @@ from django.contrib import admin
 from django.urls import URLPattern, URLResolver, include, path
 from django.views.generic import TemplateView
 
+from apps.common.views import metrics
+
 urlpatterns: list[URLPattern | URLResolver] = [
     path("", include("apps.users.urls.auth")),
     path("admin/", admin.site.urls),
+    path("metrics/", metrics, name="metrics"),
 ]
 
 if settings.DEBUG:
@@ -3,5 +3,8 @@ set -e
 
 mkdir -p /app/logs
 
+# Worker processes reuse database connections differently (conf/settings.py).
+export PROCESS_TYPE="${PROCESS_TYPE:-worker}"
+
 echo "🚀 Starting Celery worker..."
 exec "$@"
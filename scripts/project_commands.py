@@ -1,8 +1,9 @@
 # Utility script for common project commands.
 # Originally a workaround for Poetry; now used with uv.
 import os
+import signal
 import sys
-from subprocess import check_call  # noqa: B404  # noqa: B404
+from subprocess import Popen, check_call  # noqa: B404  # noqa: B404
 
 
 def server(*args) -> None:
@@ -18,6 +19,44 @@ def worker() -> None:
     check_call([sys.executable, "manage.py", "celery_autoreload"])  # noqa: S603, B603
 
 
+def workers(*queues: str) -> None:
+    """Start one Celery worker pool per queue, sized to this host's CPUs."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "conf.settings")
+    from django.conf import settings
+
+    from apps.common.celery.queues import worker_concurrency
+
+    celery_path = os.path.join(os.path.dirname(sys.executable), "celery")
+    cpu_count = os.cpu_count() or 1
+    processes = []
+    for queue in queues or settings.CELERY_QUEUE_PROFILES:
+        command = [
+            celery_path,
+            "-A",
+            "conf",
+            "worker",
+            "-Q",
+            queue,
+            "-n",
+            f"{queue}@%h",
+            "-c",
+            str(worker_concurrency(queue, cpu_count)),
+            "-l",
+            "info",
+        ]
+        env = {**os.environ, "CELERY_WORKER_QUEUE": queue, "PROCESS_TYPE": "worker"}
+        processes.append(Popen(command, env=env))  # noqa: S603
+
+    try:
+        for process in processes:
+            process.wait()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.send_signal(signal.SIGTERM)
+        for process in processes:
+            process.wait()
+
+
 def migrate() -> None:
     check_call([sys.executable, "manage.py", "migrate"])  # noqa: S603, B603
 
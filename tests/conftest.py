@@ -3,14 +3,40 @@ Global pytest configuration and fixtures.
 """
 
 import factory
+import fakeredis
 import pytest
 from django.contrib.auth import get_user_model
 from factory.django import DjangoModelFactory
 from rest_framework.test import APIClient
 
+from apps.common import redis_client
+from conf.celery import app as celery_app
+
 User = get_user_model()
 
 
+@pytest.fixture(scope="session", autouse=True)
+def celery_memory_broker():
+    """Publish tasks to an in-memory broker instead of Redis."""
+    celery_app.conf.CELERY_BROKER_URL = "memory://"
+
+
+@pytest.fixture
+def celery_eager():
+    """Run tasks inline when they are sent."""
+    celery_app.conf.CELERY_TASK_ALWAYS_EAGER = True
+    yield
+    celery_app.conf.CELERY_TASK_ALWAYS_EAGER = False
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """Point get_redis() at an in-memory Redis."""
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(redis_client, "_client", client)
+    return client
+
+
 @pytest.fixture
 def api_client():
     """DRF API client for testing API endpoints."""
@@ -0,0 +1,25 @@
+from apps.misc.management.commands.celery_autoreload import (
+    BASE_DIR,
+    changed_paths,
+    needs_supervisor_restart,
+)
+
+
+def test_changed_paths_detects_edits_additions_and_removals():
+    edited, added, removed, same = (
+        BASE_DIR / "apps" / name for name in ("a.py", "b.py", "c.py", "d.py")
+    )
+    before = {edited: 1.0, removed: 1.0, same: 1.0}
+    after = {edited: 2.0, added: 1.0, same: 1.0}
+
+    assert changed_paths(before, after) == {edited, added, removed}
+
+
+def test_only_configuration_changes_restart_the_supervisor():
+    assert not needs_supervisor_restart({BASE_DIR / "apps/users/models.py"})
+    assert not needs_supervisor_restart({BASE_DIR / "apps/confirm.py"})
+    assert needs_supervisor_restart({BASE_DIR / "conf/settings.py"})
+    assert needs_supervisor_restart({BASE_DIR / ".env"})
+    assert needs_supervisor_restart(
+        {BASE_DIR / "apps/misc/management/commands/celery_autoreload.py"}
+    )
@@ -1,3 +1,5 @@
+from django.db import models
+
 from apps.misc.choices import Choices
 
 
@@ -30,3 +32,71 @@ def test_choices_accessor():
 
     assert AccessoryType.WIG == "WIG"
     assert AccessoryType.NECKLACE == "NC"
+
+
+def test_choices_keep_definition_order():
+    class Size(Choices):
+        SMALL = ("S", "Small")
+        MEDIUM = ("M", "Medium")
+        LARGE = ("L", "Large")
+
+    assert Size.keys() == ("S", "M", "L")
+    assert Size.choices() == (("S", "Small"), ("M", "Medium"), ("L", "Large"))
+
+
+def test_choices_lookups():
+    class Size(Choices):
+        SMALL = ("S", "Small")
+        MEDIUM = "M"
+        LARGE = ("L",)
+
+    assert Size.label_for("S") == "Small"
+    assert Size.label_for("M") == "MEDIUM"
+    assert Size.label_for("L") == "LARGE"
+    assert Size.label_for("XL") is None
+    assert Size.value_for("Small") == "S"
+    assert Size.is_valid("S")
+    assert not Size.is_valid("XL")
+
+
+def test_choices_inheritance():
+    class Size(Choices):
+        SMALL = ("S", "Small")
+
+    class ExtendedSize(Size):
+        LARGE = ("L", "Large")
+
+    assert ExtendedSize.keys() == ("S", "L")
+    assert ExtendedSize.SMALL == "S"
+    assert Size.keys() == ("S",)
+
+
+def test_choices_as_django_choices():
+    class Size(Choices):
+        SMALL = ("S", "Small")
+        LARGE = ("L", "Large")
+
+    class Priority(Choices):
+        LOW = (1, "Low")
+        HIGH = (2, "High")
+
+    size_choices = Size.as_django_choices()
+    assert issubclass(size_choices, models.TextChoices)
+    assert size_choices.SMALL == "S"
+    assert size_choices.SMALL.label == "Small"
+    assert size_choices.choices == [("S", "Small"), ("L", "Large")]
+    assert Size.as_django_choices() is size_choices
+
+    assert issubclass(Priority.as_django_choices(), models.IntegerChoices)
+    assert Priority.as_django_choices().HIGH.label == "High"
+
+
+def test_choices_check_constraint():
+    class Size(Choices):
+        SMALL = ("S", "Small")
+        LARGE = ("L", "Large")
+
+    constraint = Size.check_constraint("size", name="size_valid")
+
+    assert constraint.name == "size_valid"
+    assert constraint.condition == models.Q(size__in=("S", "L"))
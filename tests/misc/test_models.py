@@ -0,0 +1,206 @@
+import time
+import uuid
+from unittest import mock
+
+import pytest
+from django.core.cache import caches
+from django.db import IntegrityError, models
+from rest_framework import generics
+from rest_framework.test import APIRequestFactory
+
+from apps.common.mixin import KeyLookupMixin
+from apps.common.responses import APIResponse
+from apps.misc.models import KeyModel, UUIDKeyModel, _local_key_cache, uuid7
+
+
+class KeyedItem(KeyModel):
+    name = models.CharField(max_length=50, blank=True)
+
+    class Meta:
+        app_label = "misc"
+
+
+class UUIDKeyedItem(UUIDKeyModel):
+    name = models.CharField(max_length=50, blank=True)
+
+    class Meta:
+        app_label = "misc"
+
+
+def test_uuid7_is_version_7_and_time_ordered():
+    first = uuid7()
+    one_second_later = time.time_ns() + 10**9
+    with mock.patch("apps.misc.models.time.time_ns", return_value=one_second_later):
+        later = uuid7()
+
+    assert first.version == 7
+    assert first.variant == uuid.RFC_4122
+    assert later > first
+
+
+@pytest.mark.django_db
+def test_save_assigns_key():
+    item = KeyedItem.objects.create(name="a")
+
+    assert uuid.UUID(item.key)
+    assert item.short_key == item.key[:8]
+
+
+@pytest.mark.django_db
+def test_save_keeps_explicit_key():
+    item = KeyedItem.objects.create(key="explicit")
+
+    assert item.key == "explicit"
+
+
+@pytest.mark.django_db
+def test_save_retries_on_key_collision():
+    existing = KeyedItem.objects.create()
+    keys = iter([existing.key, "fresh-key"])
+
+    with mock.patch.object(KeyedItem, "generate_key", side_effect=lambda: next(keys)):
+        item = KeyedItem.objects.create()
+
+    assert item.key == "fresh-key"
+    assert KeyedItem.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_save_gives_up_after_repeated_collisions():
+    existing = KeyedItem.objects.create()
+
+    with (
+        mock.patch.object(KeyedItem, "generate_key", return_value=existing.key),
+        pytest.raises(IntegrityError),
+    ):
+        KeyedItem.objects.create()
+
+    assert KeyedItem.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_bulk_create_assigns_keys():
+    items = KeyedItem.objects.bulk_create(
+        [KeyedItem(name="a"), KeyedItem(name="b"), KeyedItem(key="kept")]
+    )
+
+    keys = set(KeyedItem.objects.values_list("key", flat=True))
+    assert keys == {item.key for item in items}
+    assert "kept" in keys
+    assert "" not in keys
+
+
+@pytest.mark.django_db
+def test_uuid_key_model():
+    item = UUIDKeyedItem.objects.create()
+    UUIDKeyedItem.objects.bulk_create([UUIDKeyedItem(), UUIDKeyedItem()])
+
+    assert isinstance(item.key, uuid.UUID)
+    assert item.key.version == 7
+    assert item.short_key == item.key.hex[-8:]
+    assert UUIDKeyedItem.objects.get(key=item.key) == item
+    assert UUIDKeyedItem.objects.filter(key__isnull=True).count() == 0
+
+
+@pytest.fixture
+def key_cache():
+    caches["default"].clear()
+    _local_key_cache().clear()
+    yield
+    caches["default"].clear()
+    _local_key_cache().clear()
+
+
+@pytest.mark.django_db
+def test_get_by_key_caches_in_both_tiers(key_cache, django_assert_num_queries):
+    item = KeyedItem.objects.create(name="a")
+
+    with django_assert_num_queries(1):
+        assert KeyedItem.objects.get_by_key(item.key) == item
+    with django_assert_num_queries(0):
+        assert KeyedItem.objects.get_by_key(item.key).name == "a"
+
+    _local_key_cache().clear()
+    with django_assert_num_queries(0):
+        assert KeyedItem.objects.get_by_key(item.key) == item
+
+
+@pytest.mark.django_db
+def test_get_by_key_returns_copies(key_cache):
+    item = KeyedItem.objects.create(name="a")
+
+    KeyedItem.objects.get_by_key(item.key).name = "changed"
+
+    assert KeyedItem.objects.get_by_key(item.key).name == "a"
+
+
+@pytest.mark.django_db
+def test_get_by_key_caches_missing_keys(key_cache, django_assert_num_queries):
+    with django_assert_num_queries(1), pytest.raises(KeyedItem.DoesNotExist):
+        KeyedItem.objects.get_by_key("missing")
+    with django_assert_num_queries(0), pytest.raises(KeyedItem.DoesNotExist):
+        KeyedItem.objects.get_by_key("missing")
+
+
+@pytest.mark.django_db
+def test_save_and_delete_invalidate_cache(
+    key_cache, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        item = KeyedItem.objects.create(name="a")
+    KeyedItem.objects.get_by_key(item.key)
+
+    item.name = "b"
+    with django_capture_on_commit_callbacks(execute=True):
+        item.save()
+    assert KeyedItem.objects.get_by_key(item.key).name == "b"
+
+    key = item.key
+    with django_capture_on_commit_callbacks(execute=True):
+        item.delete()
+    with pytest.raises(KeyedItem.DoesNotExist):
+        KeyedItem.objects.get_by_key(key)
+
+
+@pytest.mark.django_db
+def test_create_invalidates_cached_miss(key_cache, django_capture_on_commit_callbacks):
+    with pytest.raises(KeyedItem.DoesNotExist):
+        KeyedItem.objects.get_by_key("later")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        KeyedItem.objects.bulk_create([KeyedItem(key="later")])
+
+    assert KeyedItem.objects.get_by_key("later").key == "later"
+
+
+@pytest.mark.django_db
+def test_get_many_by_key_uses_one_query(key_cache, django_assert_num_queries):
+    items = UUIDKeyedItem.objects.bulk_create([UUIDKeyedItem() for _ in range(3)])
+    cached = items[0]
+    UUIDKeyedItem.objects.get_by_key(cached.key)
+    keys = [str(item.key) for item in items] + ["not-a-uuid", str(uuid.uuid4())]
+
+    with django_assert_num_queries(1):
+        found = UUIDKeyedItem.objects.get_many_by_key(keys)
+
+    assert found == {str(item.key): item for item in items}
+
+
+@pytest.mark.django_db
+def test_key_lookup_mixin(key_cache):
+    class ItemView(KeyLookupMixin, generics.RetrieveAPIView):
+        queryset = KeyedItem.objects.all()
+
+        def retrieve(self, request, *args, **kwargs):
+            return APIResponse.success(data={"name": self.get_object().name})
+
+    item = KeyedItem.objects.create(name="a")
+    view = ItemView.as_view()
+    factory = APIRequestFactory()
+
+    response = view(factory.get("/"), key=item.key)
+    assert response.status_code == 200
+    assert response.data["data"] == {"name": "a"}
+
+    response = view(factory.get("/"), key="missing")
+    assert response.status_code == 404
@@ -0,0 +1,45 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+from conf.celery import app as celery_app
+
+
+@pytest.fixture
+def loadtest_queue():
+    yield "loadtest"
+    with celery_app.connection_for_write() as conn:
+        conn.default_channel.queue_purge("loadtest")
+
+
+def test_load_generator_reports_latency(loadtest_queue, capsys):
+    call_command(
+        "test_celery",
+        "--broker=memory://",
+        f"--queue={loadtest_queue}",
+        "--worker",
+        "--count=20",
+        "--json",
+    )
+
+    report = json.loads(capsys.readouterr().out)
+    assert report["completed"] == 20
+    assert report["failed"] == 0
+    assert report["latency_ms"]["count"] == 20
+    assert report["latency_ms"]["p50"] <= report["latency_ms"]["p99"]
+    assert report["throughput"] > 0
+
+
+def test_load_generator_without_result_backend(loadtest_queue, capsys):
+    call_command(
+        "test_celery",
+        "--broker=memory://",
+        f"--queue={loadtest_queue}",
+        "--count=5",
+        "--rate=500",
+    )
+
+    out = capsys.readouterr().out
+    assert "Published 5 tasks" in out
+    assert "No result backend configured" in out
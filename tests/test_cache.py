@@ -0,0 +1,151 @@
+"""
+Tests for the tiered cache.
+"""
+
+import threading
+import time
+
+import pytest
+from django.contrib.auth.models import Group
+from django.core.cache import caches
+
+from apps.common import cache as tiered
+from apps.common.cache import TieredCache
+from apps.common.pagination import CachedCountPaginator
+
+
+@pytest.fixture
+def cache():
+    caches["default"].clear()
+    yield TieredCache(alias="default", timeout=60, lock_timeout=1)
+    caches["default"].clear()
+
+
+class Producer:
+    def __init__(self, value="value"):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+class TestTieredCache:
+    """Test reads, writes and invalidation across both tiers."""
+
+    def test_get_or_set_computes_once(self, cache):
+        """Test the producer runs on the first miss only."""
+        producer = Producer()
+
+        assert cache.get_or_set("key", producer) == "value"
+        assert cache.get_or_set("key", producer) == "value"
+        assert producer.calls == 1
+
+    def test_shared_tier_serves_other_processes(self, cache):
+        """Test a value computed elsewhere is read from L2 and kept in L1."""
+        TieredCache(alias="default").set("key", "shared")
+
+        assert cache.get("key") == "shared"
+        caches["default"].clear()
+        assert cache.get("key") == "shared"
+
+    def test_none_is_cached(self, cache):
+        """Test a None result is cached rather than recomputed."""
+        producer = Producer(None)
+        cache.get_or_set("key", producer)
+        cache.get_or_set("key", producer)
+
+        assert producer.calls == 1
+
+    def test_namespace_invalidation(self, cache):
+        """Test invalidating a namespace orphans its keys only."""
+        cache.set("a", 1, namespace="users")
+        cache.set("b", 2, namespace="orders")
+        other = TieredCache(alias="default")
+        assert other.get("a", namespace="users") == 1
+
+        cache.invalidate_namespace("users")
+
+        assert cache.get("a", namespace="users") is None
+        assert cache.get("b", namespace="orders") == 2
+        # Other processes notice once their copy of the version expires.
+        other.clear_local()
+        assert other.get("a", namespace="users") is None
+
+    def test_shared_cache_errors_fall_back_to_producer(self, cache, monkeypatch):
+        """Test an unavailable L2 degrades to computing the value."""
+
+        def broken(*args, **kwargs):
+            raise ConnectionError
+
+        for method in ("get", "set", "add", "delete"):
+            monkeypatch.setattr(caches["default"], method, broken)
+
+        assert cache.get_or_set("key", Producer()) == "value"
+
+
+class TestStampedeProtection:
+    """Test single-flight locking and early refresh."""
+
+    def test_waits_for_lock_holder(self, cache):
+        """Test a miss waits for the caller already computing the value."""
+        full_key = cache.make_key("key")
+        caches["default"].add(f"{full_key}:lock", 1)
+        threading.Timer(
+            0.1, TieredCache(alias="default").set, ("key", "theirs")
+        ).start()
+        producer = Producer("mine")
+
+        assert cache.get_or_set("key", producer) == "theirs"
+        assert producer.calls == 0
+
+    def test_computes_when_lock_holder_is_gone(self, cache):
+        """Test waiters give up after the lock timeout and compute themselves."""
+        caches["default"].add(f"{cache.make_key('key')}:lock", 1)
+        cache.lock_timeout = 0.1
+        producer = Producer()
+
+        assert cache.get_or_set("key", producer) == "value"
+        assert producer.calls == 1
+
+    def test_early_refresh(self, cache, monkeypatch):
+        """Test an entry due for early refresh is recomputed by one caller."""
+        cache.get_or_set("key", Producer("old"))
+        monkeypatch.setattr(cache, "_should_refresh", lambda entry: True)
+
+        assert cache.get_or_set("key", Producer("new")) == "new"
+
+    def test_early_refresh_serves_current_value_while_locked(self, cache, monkeypatch):
+        """Test other callers keep the current value while one refreshes."""
+        cache.get_or_set("key", Producer("old"))
+        monkeypatch.setattr(cache, "_should_refresh", lambda entry: True)
+        caches["default"].add(f"{cache.make_key('key')}:lock", 1)
+        producer = Producer("new")
+
+        assert cache.get_or_set("key", producer) == "old"
+        assert producer.calls == 0
+
+    def test_refresh_probability(self, cache):
+        """Test entries are refreshed near expiry, not long before it."""
+        assert not cache._should_refresh((None, time.time() + 60, 0.0))
+        assert cache._should_refresh((None, time.time() - 1, 0.0))
+
+
+@pytest.mark.django_db
+class TestCachedCountPaginator:
+    """Test pagination counts come from the tiered cache."""
+
+    def test_count_is_cached_per_query(self, cache):
+        """Test counts are reused per filter until the namespace is invalidated."""
+        tiered.tiered_cache.cache_clear()
+        Group.objects.bulk_create(Group(name=f"group-{i}") for i in range(3))
+
+        queryset = Group.objects.order_by("pk")
+        assert CachedCountPaginator(queryset, 2, namespace="groups").count == 3
+        Group.objects.create(name="late")
+        assert CachedCountPaginator(queryset, 2, namespace="groups").count == 3
+        filtered = queryset.filter(name__startswith="group-")
+        assert CachedCountPaginator(filtered, 2, namespace="groups").count == 3
+        tiered.tiered_cache().invalidate_namespace("groups")
+        assert CachedCountPaginator(queryset, 2, namespace="groups").count == 4
@@ -0,0 +1,73 @@
+"""
+Tests for batched Celery tasks.
+"""
+
+import threading
+
+import pytest
+
+from apps.common.celery.batching import batched_task
+from conf.celery import app as celery_app
+
+received = []
+
+
+@batched_task(flush_every=3, flush_interval=0.05)
+def record_views(batch):
+    received.append(batch)
+
+
+@pytest.fixture
+def eager(celery_eager):
+    received.clear()
+    yield
+    record_views.flush()
+
+
+class TestBatchedTask:
+    """Test the batched_task decorator."""
+
+    def test_flushes_when_full(self, eager):
+        """Test a full buffer is sent as one task with argument tuples."""
+        record_views.delay(1, "a")
+        record_views.delay(2, "b")
+        assert received == []
+
+        record_views.delay(3, "c")
+
+        assert received == [[(1, "a"), (2, "b"), (3, "c")]]
+        assert record_views.pending() == 0
+
+    def test_flushes_after_interval(self, eager):
+        """Test a partial buffer is sent once the interval passes."""
+        record_views.delay(1, "a")
+        # Wait for the timer thread itself: an eager send toggles Celery's
+        # process-wide "join will block" flag until it returns.
+        for thread in threading.enumerate():
+            if isinstance(thread, threading.Timer):
+                thread.join(timeout=2)
+
+        assert received == [[(1, "a")]]
+
+    def test_manual_flush(self, eager):
+        """Test flush() sends whatever is buffered."""
+        record_views.delay(1, "a")
+        record_views.flush()
+        record_views.flush()
+
+        assert received == [[(1, "a")]]
+
+    def test_publishes_one_message_per_batch(self):
+        """Test a flushed batch is a single message on the broker."""
+        for i in range(3):
+            record_views.delay(i)
+
+        with celery_app.connection_for_write() as conn:
+            channel = conn.default_channel
+            queue = channel.queue_declare("default", passive=True)
+            message = channel.basic_get("default")
+            channel.queue_purge("default")
+
+        assert queue.message_count == 1
+        assert message.headers["task"] == record_views.name
+        assert message.decode()[0] == [[[0], [1], [2]]]
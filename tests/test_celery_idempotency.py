@@ -0,0 +1,104 @@
+"""
+Tests for deduplicated Celery task execution.
+"""
+
+import threading
+import time
+
+import pytest
+from celery import shared_task
+
+from apps.common.celery.idempotency import DuplicateTaskTimeoutError, IdempotentTask
+
+calls = []
+
+
+@shared_task(base=IdempotentTask, idempotency_window=60)
+def charge(order_id, amount):
+    calls.append((order_id, amount))
+    return {"order": order_id, "charged": amount}
+
+
+@shared_task(base=IdempotentTask, idempotency_wait_timeout=0.2)
+def slow_export(name):
+    calls.append(name)
+    time.sleep(0.5)
+    return name
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    calls.clear()
+
+
+class TestIdempotentTask:
+    """Test IdempotentTask deduplication."""
+
+    def test_duplicate_returns_stored_result(self, fake_redis, celery_eager):
+        """Test a repeated call is skipped and returns the first result."""
+        first = charge.delay(1, 100).get()
+        second = charge.delay(1, 100).get()
+
+        assert calls == [(1, 100)]
+        assert second == first == {"order": 1, "charged": 100}
+
+    def test_different_arguments_run(self, fake_redis, celery_eager):
+        """Test calls with different arguments are not deduplicated."""
+        charge.delay(1, 100)
+        charge.delay(2, 100)
+
+        assert calls == [(1, 100), (2, 100)]
+
+    def test_explicit_key(self, fake_redis, celery_eager):
+        """Test an explicit idempotency key overrides the argument hash."""
+        charge.apply_async((1, 100), headers={"idempotency_key": "order-1"})
+        charge.apply_async((1, 200), headers={"idempotency_key": "order-1"})
+
+        assert calls == [(1, 100)]
+
+    def test_failure_is_not_stored(self, fake_redis, celery_eager):
+        """Test a failed run doesn't block the next attempt."""
+
+        @shared_task(base=IdempotentTask)
+        def flaky():
+            calls.append("run")
+            if len(calls) == 1:
+                raise RuntimeError("boom")
+            return "ok"
+
+        with pytest.raises(RuntimeError):
+            flaky.apply(throw=True)
+
+        assert flaky.apply().get() == "ok"
+        assert calls == ["run", "run"]
+
+    def test_concurrent_duplicate_waits_for_result(self, fake_redis):
+        """Test a concurrent duplicate waits and returns the first result."""
+        slow_export.idempotency_wait_timeout = 5
+        try:
+            results = []
+            threads = [
+                threading.Thread(target=lambda: results.append(slow_export("a")))
+                for _ in range(2)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            slow_export.idempotency_wait_timeout = 0.2
+
+        assert calls == ["a"]
+        assert results == ["a", "a"]
+
+    def test_concurrent_duplicate_times_out(self, fake_redis):
+        """Test a duplicate gives up if the first run takes too long."""
+        thread = threading.Thread(target=slow_export, args=("b",))
+        thread.start()
+        time.sleep(0.05)
+
+        with pytest.raises(DuplicateTaskTimeoutError):
+            slow_export("b")
+        thread.join()
+
+        assert calls == ["b"]
@@ -0,0 +1,123 @@
+"""
+Tests for Celery task metrics.
+"""
+
+import time
+
+import pytest
+from celery import shared_task
+from django.core.management import call_command
+
+from apps.common.celery.metrics import collect, metrics, render_prometheus
+from conf.celery import app as celery_app
+
+
+@shared_task
+def add(a, b):
+    return a + b
+
+
+@shared_task
+def explode():
+    raise RuntimeError("boom")
+
+
+@pytest.fixture
+def task_metrics(settings, fake_redis, celery_eager):
+    settings.TASK_METRICS_ENABLED = True
+    settings.TASK_METRICS_FLUSH_INTERVAL = 3600
+    metrics.flush()
+    fake_redis.flushall()
+    return metrics
+
+
+class TestTaskMetrics:
+    """Test task metric recording and export."""
+
+    def test_records_runtime_across_flushes(self, task_metrics):
+        """Test runs are aggregated in-process and summed in Redis."""
+        add.delay(1, 2)
+        add.delay(3, 4)
+        assert collect() == {}
+
+        task_metrics.flush()
+        add.delay(5, 6)
+        task_metrics.flush()
+
+        totals = collect()
+        assert totals["runtime_count"] == {add.name: 3}
+        assert sum(totals["runtime_bucket"].values()) == 3
+
+    def test_records_queue_wait(self, task_metrics):
+        """Test queue wait is measured from the published_at header."""
+        add.apply((1, 2), headers={"published_at": time.time() - 2})
+        task_metrics.flush()
+
+        totals = collect()
+        assert totals["queue_wait_count"] == {add.name: 1}
+        assert 2 <= totals["queue_wait_sum"][add.name] < 5
+        assert totals["queue_wait_bucket"] == {f"{add.name}|2.5": 1}
+
+    def test_counts_failures(self, task_metrics):
+        """Test failed runs are counted."""
+        explode.apply()
+        task_metrics.flush()
+
+        assert collect()["failures"] == {explode.name: 1}
+
+    def test_publish_stamps_header(self, settings):
+        """Test published messages carry their publish time."""
+        settings.TASK_METRICS_ENABLED = True
+        before = time.time()
+        add.delay(1, 2)
+
+        with celery_app.connection_for_write() as conn:
+            message = conn.default_channel.basic_get("default")
+            conn.default_channel.queue_purge("default")
+
+        assert before <= message.headers["published_at"] <= time.time()
+
+    def test_disabled(self, task_metrics, settings):
+        """Test nothing is recorded when metrics are disabled."""
+        settings.TASK_METRICS_ENABLED = False
+        add.delay(1, 2)
+        task_metrics.flush()
+
+        assert collect() == {}
+
+    def test_render_prometheus(self):
+        """Test histograms are cumulative and counters are listed."""
+        totals = {
+            "runtime_bucket": {"t|0.1": 2, "t|1": 1},
+            "runtime_sum": {"t": 0.75},
+            "runtime_count": {"t": 3},
+            "failures": {"t": 1},
+        }
+
+        text = render_prometheus(totals)
+
+        assert "# TYPE celery_task_runtime_seconds histogram" in text
+        assert 'celery_task_runtime_seconds_bucket{task="t",le="0.05"} 0' in text
+        assert 'celery_task_runtime_seconds_bucket{task="t",le="0.1"} 2' in text
+        assert 'celery_task_runtime_seconds_bucket{task="t",le="+Inf"} 3' in text
+        assert 'celery_task_runtime_seconds_sum{task="t"} 0.75' in text
+        assert 'celery_task_failures_total{task="t"} 1' in text
+
+    def test_command_and_endpoint(self, task_metrics, settings, client, capsys):
+        """Test the metrics are served by the command and the endpoint."""
+        add.delay(1, 2)
+        task_metrics.flush()
+
+        call_command("task_metrics")
+        assert f'celery_task_runtime_seconds_count{{task="{add.name}"}} 1' in (
+            capsys.readouterr().out
+        )
+
+        settings.METRICS_TOKEN = "secret"  # noqa: S105
+        assert client.get("/metrics/").status_code == 403
+        response = client.get("/metrics/", headers={"Authorization": "Bearer secret"})
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+
+        call_command("task_metrics", "--reset")
+        assert collect() == {}
@@ -0,0 +1,56 @@
+"""
+Tests for Celery queue routing and worker profiles.
+"""
+
+from apps.common.celery.queues import BULK, CRITICAL, queue_task, worker_concurrency
+from conf.celery import app as celery_app
+
+
+@queue_task(CRITICAL)
+def notify(user_id):
+    return user_id
+
+
+@queue_task(BULK, acks_late=False)
+def rebuild_report():
+    return None
+
+
+def route(name):
+    return celery_app.amqp.router.route({}, name)["queue"].name
+
+
+def queue_length(queue):
+    with celery_app.connection_for_write() as conn:
+        channel = conn.default_channel
+        length = channel.queue_declare(queue, passive=True).message_count
+        channel.queue_purge(queue)
+    return length
+
+
+class TestQueueRouting:
+    """Test how tasks are assigned to queues."""
+
+    def test_routes_by_naming_convention(self):
+        """Test route patterns pick the queue from the task name."""
+        assert route("apps.users.tasks.send_welcome_email") == CRITICAL
+        assert route("apps.users.reports.export_users") == BULK
+        assert route("apps.misc.tasks.task_dummy") == "default"
+
+    def test_queue_task_publishes_to_its_queue(self):
+        """Test tasks declared with queue_task go to that queue."""
+        notify.delay(1)
+
+        assert queue_length(CRITICAL) == 1
+
+    def test_queue_task_applies_profile(self):
+        """Test queue_task takes acks_late from the queue profile."""
+        assert notify.acks_late is True
+        assert notify.reject_on_worker_lost is True
+        assert rebuild_report.acks_late is False
+
+
+def test_worker_concurrency_scales_with_cpus():
+    assert worker_concurrency(CRITICAL, 4) == 8
+    assert worker_concurrency(BULK, 4) == 4
+    assert worker_concurrency(BULK, 0) == 1
@@ -0,0 +1,110 @@
+"""
+Tests for database connection reuse settings and pool statistics.
+"""
+
+import json
+import os
+import subprocess  # noqa: S404
+import sys
+
+import pytest
+
+from apps.common import db
+
+
+def database_settings(**env) -> dict:
+    """Load conf.settings in a fresh interpreter with ``env`` applied."""
+    code = (
+        "import json; from conf import settings; "
+        "print(json.dumps(settings.DATABASES['default'], default=str))"
+    )
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", code],
+        env={**os.environ, **env},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout)
+
+
+POSTGRES_URL = "postgres://user:pass@db:5432/app"
+
+
+class TestConnectionReuseSettings:
+    """Test how DATABASES is configured for web and worker processes."""
+
+    def test_web_pool_sized_from_threads(self):
+        """Test web processes get a psycopg pool with one slot per thread."""
+        config = database_settings(DB_URL=POSTGRES_URL, WEB_THREADS="8")
+
+        assert config["CONN_MAX_AGE"] == 0
+        assert config["OPTIONS"]["pool"]["max_size"] == 8
+        assert config["OPTIONS"]["pool"]["min_size"] == 1
+
+    def test_worker_uses_persistent_connections(self):
+        """Test Celery processes keep one health-checked connection."""
+        config = database_settings(DB_URL=POSTGRES_URL, PROCESS_TYPE="worker")
+
+        assert "pool" not in config.get("OPTIONS", {})
+        assert config["CONN_MAX_AGE"] == 600
+        assert config["CONN_HEALTH_CHECKS"] is True
+
+    def test_sqlite_falls_back_to_persistent(self):
+        """Test databases without pool support use persistent connections."""
+        config = database_settings(DB_URL="sqlite:///db.sqlite3")
+
+        assert "pool" not in config.get("OPTIONS", {})
+        assert config["CONN_MAX_AGE"] == 600
+
+    def test_reuse_can_be_turned_off(self):
+        """Test DB_CONN_REUSE_WEB=off restores per-request connections."""
+        config = database_settings(DB_URL=POSTGRES_URL, DB_CONN_REUSE_WEB="off")
+
+        assert "pool" not in config.get("OPTIONS", {})
+        assert config.get("CONN_MAX_AGE", 0) == 0
+
+
+class TestPoolStats:
+    """Test publishing and exporting pool statistics."""
+
+    @pytest.fixture
+    def pooled(self, settings, fake_redis, monkeypatch):
+        settings.REDIS_URL = "redis://fake"
+        monkeypatch.setattr(db, "_last_publish", 0.0)
+        monkeypatch.setattr(
+            db,
+            "pool_stats",
+            lambda: {"default": {"pool_size": 4, "requests_wait_ms": 120}},
+        )
+
+    def test_publish_and_collect(self, pooled, settings):
+        """Test a process's stats are readable by any other process."""
+        db.publish_pool_stats()
+
+        stats = db.collect_pool_stats()
+        assert list(stats.values()) == [
+            {"default": {"pool_size": 4, "requests_wait_ms": 120}}
+        ]
+        assert list(stats)[0].endswith(f":{os.getpid()}")
+
+    def test_publish_is_throttled(self, pooled, fake_redis):
+        """Test stats are published at most once per interval."""
+        db.publish_pool_stats()
+        fake_redis.flushall()
+        db.publish_pool_stats()
+
+        assert db.collect_pool_stats() == {}
+
+    def test_render(self):
+        """Test gauges and counters are labelled by process and alias."""
+        text = db.render_pool_stats(
+            {"web-1:42": {"default": {"pool_size": 4, "requests_wait_ms": 120}}}
+        )
+
+        assert "# TYPE db_pool_pool_size gauge" in text
+        lines = text.splitlines()
+        labels = '{process="web-1:42",alias="default"}'
+        assert f"db_pool_pool_size{labels} 4" in lines
+        assert f"db_pool_requests_wait_ms_total{labels} 120" in lines
+        assert f"db_pool_requests_errors_total{labels} 0" in lines
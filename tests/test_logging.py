@@ -0,0 +1,172 @@
+"""
+Tests for queued logging, JSON output and request IDs.
+"""
+
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from apps.common import log
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def make_record(name="apps.test", level=logging.INFO, msg="hello %s", args=("world",)):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+@pytest.fixture
+def queued():
+    """A QueueHandler wired to a ListHandler, as dictConfig would build it."""
+    target = ListHandler()
+    handler = log.QueueHandler(queue.Queue(maxsize=2))
+    handler.listener = logging.handlers.QueueListener(handler.queue, target)
+    yield handler, target
+    handler._stop()
+
+
+class TestQueueHandler:
+    """Test records are handed to a background listener."""
+
+    def test_listener_starts_on_first_record(self, queued):
+        """Test the listener thread is started lazily and delivers records."""
+        handler, target = queued
+        assert handler.listener._thread is None
+
+        handler.handle(make_record())
+        handler._stop()
+
+        assert [record.getMessage() for record in target.records] == ["hello world"]
+
+    def test_exception_kept_separate_from_message(self, queued):
+        """Test tracebacks reach the target handler as exc_text."""
+        handler, target = queued
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord(
+                "apps.test", logging.ERROR, __file__, 1, "failed", None, None
+            )
+            record.exc_info = sys.exc_info()
+
+        prepared = handler.prepare(record)
+
+        assert prepared.msg == "failed"
+        assert prepared.exc_info is None
+        assert "ValueError: boom" in prepared.exc_text
+
+    def test_full_queue_drops_records(self, queued):
+        """Test a backed-up listener costs records, not request latency."""
+        handler, _ = queued
+        for _ in range(3):
+            handler.enqueue(make_record())
+
+        assert handler.dropped == 1
+
+    def test_restarts_after_fork(self, queued, monkeypatch):
+        """Test a forked child gets its own queue and listener thread."""
+        handler, target = queued
+        handler.handle(make_record())
+        parent_queue = handler.queue
+
+        monkeypatch.setattr(log.os, "getpid", lambda: -1)
+        handler.handle(make_record(msg="child"))
+        handler._stop()
+
+        assert handler.queue is not parent_queue
+        assert handler.listener.queue is handler.queue
+        assert "child" in [record.getMessage() for record in target.records]
+
+
+class TestFilters:
+    """Test request ID tagging and sampling."""
+
+    def test_request_id_filter(self):
+        """Test records carry the current request ID, or a placeholder."""
+        record = make_record()
+        log.RequestIDFilter().filter(record)
+        assert record.request_id == "-"
+
+        token = log.request_id.set("abc")
+        try:
+            log.RequestIDFilter().filter(record)
+        finally:
+            log.request_id.reset(token)
+        assert record.request_id == "abc"
+
+    def test_sampling(self, monkeypatch):
+        """Test DEBUG records from sampled loggers are kept at their rate."""
+        sampler = log.SamplingFilter({"apps": 1.0, "apps.misc": 0.25})
+        monkeypatch.setattr(log.random, "random", lambda: 0.5)
+
+        assert not sampler.filter(make_record("apps.misc.tasks", logging.DEBUG))
+        assert sampler.filter(make_record("apps.users", logging.DEBUG))
+        assert sampler.filter(make_record("apps.misc.tasks", logging.INFO))
+        assert sampler.filter(make_record("django", logging.DEBUG))
+
+
+class TestJSONFormatter:
+    """Test structured log output."""
+
+    def test_format(self):
+        """Test the message, request ID and extra fields are included."""
+        record = make_record()
+        record.request_id = "abc"
+        record.user_id = 7
+
+        data = json.loads(log.JSONFormatter().format(record))
+
+        assert data["message"] == "hello world"
+        assert data["level"] == "INFO"
+        assert data["logger"] == "apps.test"
+        assert data["request_id"] == "abc"
+        assert data["user_id"] == 7
+        assert "args" not in data
+
+
+class TestRequestIDMiddleware:
+    """Test request IDs are assigned and returned."""
+
+    def respond(self, **headers):
+        seen = []
+
+        def view(request):
+            seen.append(log.request_id.get())
+            return HttpResponse()
+
+        request = RequestFactory().get("/", headers=headers)
+        response = log.RequestIDMiddleware(view)(request)
+        return seen[0], response
+
+    def test_generates_id(self):
+        """Test requests without an ID get a fresh one."""
+        seen, response = self.respond()
+
+        assert len(seen) == 32
+        assert response["X-Request-ID"] == seen
+        assert log.request_id.get() is None
+
+    def test_propagates_valid_id(self):
+        """Test an upstream proxy's ID is reused."""
+        seen, response = self.respond(**{"X-Request-ID": "lb-1234"})
+
+        assert seen == response["X-Request-ID"] == "lb-1234"
+
+    def test_rejects_invalid_id(self):
+        """Test IDs that could corrupt log lines are replaced."""
+        seen, _ = self.respond(**{"X-Request-ID": "bad id\n"})
+
+        assert seen != "bad id\n"
@@ -0,0 +1,126 @@
+"""
+Tests for read-replica routing.
+"""
+
+import time
+
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from apps.common import routers
+from apps.users.models import User
+
+
+@pytest.fixture
+def replicas(settings, monkeypatch):
+    """Two replicas whose lag is read from ``lags``."""
+    settings.DB_REPLICAS = ["replica1", "replica2"]
+    settings.DB_REPLICA_MAX_LAG = 2.0
+    lags = {"replica1": 0.0, "replica2": 0.0}
+    monkeypatch.setattr(routers, "_lag", {})
+    monkeypatch.setattr(routers, "replica_lag", lambda alias: lags[alias])
+    return lags
+
+
+class TestReplicaRouter:
+    """Test where reads and writes are sent."""
+
+    router = routers.ReplicaRouter()
+
+    def test_reads_outside_requests_use_primary(self, replicas):
+        """Test tasks and commands read from the primary by default."""
+        assert self.router.db_for_read(User) == "default"
+
+    def test_reads_in_scope_use_replicas(self, replicas):
+        """Test reads inside replica_reads() go to a replica."""
+        with routers.replica_reads():
+            assert self.router.db_for_read(User) in ("replica1", "replica2")
+
+    def test_write_pins_to_primary(self, replicas):
+        """Test reads after a write in the same scope see the primary."""
+        with routers.replica_reads() as state:
+            assert self.router.db_for_write(User) == "default"
+            assert self.router.db_for_read(User) == "default"
+        assert state.wrote
+
+    def test_lagging_replicas_are_skipped(self, replicas):
+        """Test replicas behind by more than DB_REPLICA_MAX_LAG are avoided."""
+        replicas["replica1"] = 10.0
+        with routers.replica_reads():
+            assert {self.router.db_for_read(User) for _ in range(20)} == {"replica2"}
+
+        replicas["replica2"] = float("inf")
+        routers._lag.clear()
+        with routers.replica_reads():
+            assert self.router.db_for_read(User) == "default"
+
+    def test_lag_is_cached(self, replicas, settings, monkeypatch):
+        """Test lag is measured at most once per check interval."""
+        settings.DB_REPLICA_LAG_CHECK_INTERVAL = 60
+        calls = []
+        monkeypatch.setattr(
+            routers, "replica_lag", lambda alias: calls.append(alias) or 0.0
+        )
+        routers.healthy_replicas()
+        routers.healthy_replicas()
+
+        assert calls == ["replica1", "replica2"]
+
+    def test_migrations_only_run_on_primary(self):
+        """Test replicas are never migrated directly."""
+        assert self.router.allow_migrate("default", "users")
+        assert not self.router.allow_migrate("replica1", "users")
+
+
+class TestReplicaRoutingMiddleware:
+    """Test per-request routing and read-your-writes stickiness."""
+
+    router = routers.ReplicaRouter()
+
+    def respond(self, request, write=False):
+        seen = []
+
+        def view(request):
+            if write:
+                self.router.db_for_write(User)
+            seen.append(self.router.db_for_read(User))
+            return HttpResponse()
+
+        response = routers.ReplicaRoutingMiddleware(view)(request)
+        return seen[0], response
+
+    def test_get_reads_from_replica(self, replicas):
+        """Test safe requests read from a replica and set no cookie."""
+        db, response = self.respond(RequestFactory().get("/"))
+
+        assert db.startswith("replica")
+        assert routers.STICKY_COOKIE not in response.cookies
+
+    def test_post_uses_primary(self, replicas):
+        """Test unsafe requests are pinned to the primary."""
+        db, _ = self.respond(RequestFactory().post("/"))
+
+        assert db == "default"
+
+    def test_write_sets_sticky_cookie(self, replicas, settings):
+        """Test a write keeps the client on the primary for a while."""
+        settings.DB_REPLICA_STICKY_SECONDS = 5
+        _, response = self.respond(RequestFactory().post("/"), write=True)
+
+        cookie = response.cookies[routers.STICKY_COOKIE]
+        assert cookie["max-age"] == 5
+        assert cookie["httponly"]
+
+        request = RequestFactory().get("/")
+        request.COOKIES[routers.STICKY_COOKIE] = cookie.value
+        db, _ = self.respond(request)
+        assert db == "default"
+
+    def test_expired_or_invalid_cookie_is_ignored(self, replicas):
+        """Test stale or garbage cookies don't pin the client."""
+        for value in (str(time.time() - 1), "nonsense"):
+            request = RequestFactory().get("/")
+            request.COOKIES[routers.STICKY_COOKIE] = value
+            db, _ = self.respond(request)
+            assert db.startswith("replica")
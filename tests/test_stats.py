@@ -0,0 +1,39 @@
+"""
+Tests for the summary statistics helpers.
+"""
+
+import pytest
+
+from apps.common.stats import percentile, summarize
+
+
+class TestStats:
+    """Test percentile() and summarize()."""
+
+    def test_percentile_interpolates(self):
+        """Test percentiles between ranks are interpolated linearly."""
+        values = [10, 20, 30, 40]
+
+        assert percentile(values, 0) == 10
+        assert percentile(values, 50) == 25
+        assert percentile(values, 100) == 40
+        assert percentile([7], 99) == 7
+
+    def test_percentile_of_nothing(self):
+        """Test an empty sequence is rejected."""
+        with pytest.raises(ValueError):
+            percentile([], 50)
+
+    def test_summarize(self):
+        """Test the summary of unsorted values."""
+        summary = summarize([3, 1, 2, 4], percents=(50, 99.9))
+
+        assert summary == {
+            "count": 4,
+            "mean": 2.5,
+            "min": 1,
+            "max": 4,
+            "p50": 2.5,
+            "p99.9": pytest.approx(3.997),
+        }
+        assert summarize([]) == {"count": 0}